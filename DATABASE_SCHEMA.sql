@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS datasets (
     error_message TEXT,
     user_id INTEGER NOT NULL,  -- Owner of the dataset
     is_shared BOOLEAN DEFAULT 0,  -- Whether dataset is shared with others
+    quality_json TEXT,  -- JSON data quality metrics, computed once after ingestion
     
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
@@ -78,17 +79,36 @@ CREATE TABLE IF NOT EXISTS raw_sales (
     category TEXT,
     customer_id TEXT,
     transaction_id TEXT,
+    amount_ok INTEGER NOT NULL DEFAULT 1,  -- 1 if total_amount is non-zero
+    qty_ok INTEGER NOT NULL DEFAULT 1,  -- 1 if quantity is non-zero
+    name_ok INTEGER NOT NULL DEFAULT 1,  -- 1 if product_name is non-empty
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
     FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE
 );
 
 CREATE INDEX idx_sales_dataset_id ON raw_sales(dataset_id);
+CREATE INDEX idx_sales_quality ON raw_sales(dataset_id, amount_ok, qty_ok, name_ok);
 CREATE INDEX idx_sales_date ON raw_sales(date);
 CREATE INDEX idx_sales_product_name ON raw_sales(product_name);
 CREATE INDEX idx_sales_product_id ON raw_sales(product_id);
 CREATE INDEX idx_sales_category ON raw_sales(category);
 
+-- Daily sales: raw_sales totals per day and product, refreshed on ingest
+CREATE TABLE IF NOT EXISTS daily_sales (
+    dataset_id TEXT NOT NULL,
+    date DATE NOT NULL,
+    product_id TEXT,
+    product_name TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    revenue REAL NOT NULL,
+    
+    FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_daily_sales_product ON daily_sales(dataset_id, product_id, date);
+CREATE INDEX idx_daily_sales_date ON daily_sales(dataset_id, date);
+
 -- Raw inventory data: Current stock levels
 CREATE TABLE IF NOT EXISTS raw_inventory (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -138,8 +158,10 @@ CREATE TABLE IF NOT EXISTS insights (
     title TEXT NOT NULL,
     category TEXT NOT NULL CHECK(category IN ('growth', 'risk', 'efficiency')),
     confidence TEXT NOT NULL CHECK(confidence IN ('high', 'medium', 'low')),
+    confidence_rank INTEGER NOT NULL DEFAULT 3,  -- 1=high, 2=medium, 3=low (sort key)
     supporting_metrics TEXT NOT NULL,  -- JSON object
     recommended_action TEXT NOT NULL,
+    content_hash TEXT,  -- Digest of the stored fields; unchanged insights are not rewritten
     generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_active BOOLEAN DEFAULT 1,
     
@@ -151,6 +173,7 @@ CREATE INDEX idx_insights_category ON insights(category);
 CREATE INDEX idx_insights_confidence ON insights(confidence);
 CREATE INDEX idx_insights_active ON insights(is_active);
 CREATE INDEX idx_insights_generated_at ON insights(generated_at DESC);
+CREATE INDEX idx_insights_lookup ON insights(dataset_id, is_active, confidence_rank, generated_at DESC);
 
 -- AI explanations: Cached natural language explanations
 CREATE TABLE IF NOT EXISTS ai_explanations (
@@ -182,6 +182,9 @@ async def startup_event():
                         logger.info("Database tables created from schema")
             else:
                 logger.info("Database tables verified")
+        
+        # Materialized daily totals; backfills datasets loaded before the table existed
+        await Database(db_path).create_daily_aggregates()
     except Exception as e:
         logger.error(f"Error initializing database on startup: {e}")
         # Don't fail startup, but log the error
@@ -189,3 +192,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Lucid Backend API shutting down...")
+    from storage.database import close_pools
+    from services.ingestion.parser import shutdown_pdf_executor
+    await close_pools()
+    shutdown_pdf_executor()
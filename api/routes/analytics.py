@@ -228,18 +228,20 @@ async def get_sales_forecast(
 @router.get("/{dataset_id}/ml/anomalies")
 async def get_anomalies(
     dataset_id: str,
-    threshold: float = Query(2.0, ge=1.0, le=5.0, description="Z-score threshold for anomaly detection")
+    threshold: float = Query(2.0, ge=1.0, le=5.0, description="Z-score threshold for anomaly detection"),
+    method: str = Query("zscore", pattern="^(zscore|mad)$", description="'zscore' (mean/std) or 'mad' (median absolute deviation)")
 ):
     """Detect anomalies in sales data using ML."""
     db = Database(DB_PATH)
     cache = CacheManager()
     
     try:
-        results = await predictions.detect_anomalies(db, cache, dataset_id, threshold)
+        results = await predictions.detect_anomalies(db, cache, dataset_id, threshold, method)
         return {
             "dataset_id": dataset_id,
             "analytics_type": "ml_anomalies",
             "threshold": threshold,
+            "method": method,
             "results": results
         }
     except Exception as e:
@@ -17,6 +17,8 @@ from utils.logging import setup_logging
 from services.ingestion.parser import parse_file
 from services.ingestion.validator import validate_sales_data, validate_inventory_data
 from services.ingestion.normalizer import normalize_sales_data, normalize_inventory_data
+from services.insights.data_quality import calculate_data_quality
+from services.insights.engine import invalidate_insights_cache, refresh_insights_in_background
 
 # Import auth helper
 import sys
@@ -68,27 +70,39 @@ async def _store_sales_rows(db: Database, dataset_id: str, df) -> int:
     queries: list[tuple[str, tuple]] = []
     insert_sql = (
         "INSERT INTO raw_sales "
-        "(dataset_id, date, product_name, product_id, quantity, unit_price, total_amount, category, customer_id, transaction_id) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        "(dataset_id, date, product_name, product_id, quantity, unit_price, total_amount, category, customer_id, transaction_id, "
+        "amount_ok, qty_ok, name_ok) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
     )
     for _, row in df.iterrows():
+        product_name = str(row.get("product_name", ""))
+        quantity = float(row.get("quantity", 0) or 0)
+        total_amount = float(row.get("total_amount", 0) or 0)
         queries.append(
             (
                 insert_sql,
                 (
                     dataset_id,
                     row["date"].date().isoformat() if hasattr(row["date"], "date") else str(row["date"]),
-                    str(row.get("product_name", "")),
+                    product_name,
                     str(row.get("product_id", "")) if row.get("product_id") is not None else None,
-                    float(row.get("quantity", 0) or 0),
+                    quantity,
                     float(row.get("unit_price", 0) or 0),
-                    float(row.get("total_amount", 0) or 0),
+                    total_amount,
                     str(row.get("category")) if row.get("category") is not None else None,
                     str(row.get("customer_id")) if row.get("customer_id") is not None else None,
                     str(row.get("transaction_id")) if row.get("transaction_id") is not None else None,
+                    # Data quality flags for calculate_data_quality, same rule as the
+                    # backfill migration: 1 when the stored value is non-zero / non-empty.
+                    # normalize_sales_data drops rows whose name, quantity or amount
+                    # parsed as null, so a 0 here marks a zero or blank-string value
+                    int(total_amount != 0),
+                    int(quantity != 0),
+                    int(product_name != ""),
                 ),
             )
         )
+    queries.extend(Database.daily_sales_refresh(dataset_id))
     await db.execute_transaction(queries)
     return len(df)
 
@@ -237,8 +251,14 @@ async def upload_dataset(
                     raise IngestionError("; ".join(validation.errors))
                 df_norm = normalize_sales_data(df_raw, source_type=source_type)
                 row_count = await _store_sales_rows(db, dataset_id, df_norm)
+                # Compute and persist data quality once, while the rows are fresh
+                await calculate_data_quality(db, dataset_id)
 
             await db.update_dataset_status(dataset_id, "completed", row_count=row_count)
+            invalidate_insights_cache(dataset_id)
+            if schema_type != "inventory":
+                # Warm insights and guidance so the dashboard reads them from cache
+                await refresh_insights_in_background(db, CacheManager(), dataset_id)
         except Exception as ingest_err:
             logger.error(f"Ingestion failed for dataset {dataset_id}: {ingest_err}")
             await db.update_dataset_status(dataset_id, "error", error_message=str(ingest_err))
@@ -490,6 +510,10 @@ async def delete_dataset(
             "DELETE FROM raw_sales WHERE dataset_id = ?",
             (dataset_id,)
         )
+        await db.execute_write(
+            "DELETE FROM daily_sales WHERE dataset_id = ?",
+            (dataset_id,)
+        )
         
         # Delete raw inventory data
         await db.execute_write(
@@ -502,6 +526,7 @@ async def delete_dataset(
             "DELETE FROM insights WHERE dataset_id = ?",
             (dataset_id,)
         )
+        invalidate_insights_cache(dataset_id)
         
         # Delete analytics cache entries
         await db.execute_write(
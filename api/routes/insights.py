@@ -6,7 +6,7 @@ from typing import Optional
 
 from storage.database import Database
 from storage.cache import CacheManager
-from services.insights.engine import generate_insights, get_insights
+from services.insights.engine import INSIGHT_COLUMNS, generate_insights, get_insights, get_nafah_guidance
 
 router = APIRouter(prefix="/api/v1/insights", tags=["insights"])
 
@@ -54,14 +54,37 @@ async def list_insights(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{dataset_id}/guidance")
+async def get_dataset_guidance(dataset_id: str):
+    """Get the stored Nafah Guidance for a completed dataset."""
+    db = Database(DB_PATH)
+    cache = CacheManager()
+    
+    try:
+        guidance = await get_nafah_guidance(db, cache, dataset_id)
+        if not guidance:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Guidance not available for dataset: {dataset_id}"
+            )
+        return {
+            "dataset_id": dataset_id,
+            "guidance": guidance
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{dataset_id}/{insight_id}")
 async def get_insight(dataset_id: str, insight_id: str):
     """Get specific insight by ID."""
     db = Database(DB_PATH)
     
     try:
-        query = """
-            SELECT * FROM insights
+        query = f"""
+            SELECT {INSIGHT_COLUMNS} FROM insights
             WHERE dataset_id = ? AND insight_id = ? AND is_active = 1
         """
         result = await db.execute_query(query, (dataset_id, insight_id), fetch_one=True)
@@ -91,7 +114,7 @@ async def generate_dataset_insights(dataset_id: str):
     cache = CacheManager()
     
     try:
-        insights = await generate_insights(db, cache, dataset_id)
+        insights = await generate_insights(db, cache, dataset_id, force=True)
         return {
             "dataset_id": dataset_id,
             "insights_generated": len(insights),
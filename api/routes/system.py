@@ -35,8 +35,7 @@ async def health_check():
     }
     try:
         cache = CacheManager()
-        # CacheManager doesn't expose stats directly, so we estimate
-        # In a real implementation, you'd track this in CacheManager
+        cache_stats["memory"] = cache.memory_stats()
         cache_stats["status"] = "operational"
     except Exception as e:
         cache_stats["status"] = f"error: {str(e)}"
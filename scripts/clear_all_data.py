@@ -18,7 +18,7 @@ if sys.platform == 'win32':
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from storage.database import Database
+from storage.database import Database, close_pools
 from storage.cache import CacheManager
 from utils.logging import setup_logging
 
@@ -99,6 +99,9 @@ async def clear_all_data():
         sales_deleted = await db.execute_write(
             "DELETE FROM raw_sales"
         )
+        await db.execute_write(
+            "DELETE FROM daily_sales"
+        )
         print(f"   ✓ Deleted all sales data ({sales_count[0]['count'] if sales_count else 0} rows)")
         
         # Delete raw inventory data
@@ -144,5 +147,12 @@ async def clear_all_data():
         raise
 
 
+async def main():
+    try:
+        await clear_all_data()
+    finally:
+        await close_pools()
+
+
 if __name__ == "__main__":
-    asyncio.run(clear_all_data())
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""Migration: Add cached data quality metrics to datasets."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+
+def migrate_database(db_path: str = "data/nafah.db"):
+    """
+    Migrate database to add quality_json to datasets.
+    
+    Existing datasets get NULL and are computed lazily on the next
+    calculate_data_quality call.
+    """
+    db_dir = Path(db_path).parent
+    db_dir.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(datasets)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'quality_json' not in columns:
+            print("Adding quality_json column to datasets table...")
+            cursor.execute("ALTER TABLE datasets ADD COLUMN quality_json TEXT")
+            print("[OK] Added quality_json column to datasets")
+        else:
+            print("[OK] quality_json column already exists in datasets")
+        
+        conn.commit()
+        print(f"\n[OK] Migration completed successfully for {db_path}")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    db_path = os.getenv("DATABASE_PATH", "data/nafah.db")
+    migrate_database(db_path)
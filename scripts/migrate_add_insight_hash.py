@@ -0,0 +1,49 @@
+"""Migration: Add content_hash to insights."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+
+def migrate_database(db_path: str = "data/nafah.db"):
+    """
+    Migrate database to add the content_hash column to insights.
+    
+    Existing rows keep a NULL hash, so the next generation run rewrites
+    them once and stores their hash.
+    """
+    db_dir = Path(db_path).parent
+    db_dir.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(insights)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'content_hash' not in columns:
+            print("Adding content_hash column to insights table...")
+            cursor.execute("ALTER TABLE insights ADD COLUMN content_hash TEXT")
+            print("[OK] Added content_hash column")
+        else:
+            print("[OK] content_hash column already exists in insights")
+        
+        conn.commit()
+        print(f"\n[OK] Migration completed successfully for {db_path}")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    db_path = os.getenv("DATABASE_PATH", "data/nafah.db")
+    migrate_database(db_path)
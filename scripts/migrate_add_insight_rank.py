@@ -0,0 +1,64 @@
+"""Migration: Add confidence_rank and lookup index to insights."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+
+def migrate_database(db_path: str = "data/nafah.db"):
+    """
+    Migrate database to add the confidence_rank sort key to insights.
+    
+    This migration:
+    1. Adds confidence_rank column (if not exists)
+    2. Backfills it from the textual confidence
+    3. Creates the idx_insights_lookup index
+    """
+    db_dir = Path(db_path).parent
+    db_dir.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(insights)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'confidence_rank' not in columns:
+            print("Adding confidence_rank column to insights table...")
+            cursor.execute("ALTER TABLE insights ADD COLUMN confidence_rank INTEGER NOT NULL DEFAULT 3")
+            cursor.execute("""
+                UPDATE insights SET confidence_rank = CASE confidence
+                    WHEN 'high' THEN 1
+                    WHEN 'medium' THEN 2
+                    ELSE 3
+                END
+            """)
+            print("[OK] Added and backfilled confidence_rank column")
+        else:
+            print("[OK] confidence_rank column already exists in insights")
+        
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_insights_lookup "
+            "ON insights(dataset_id, is_active, confidence_rank, generated_at DESC)"
+        )
+        print("[OK] idx_insights_lookup index present")
+        
+        conn.commit()
+        print(f"\n[OK] Migration completed successfully for {db_path}")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    db_path = os.getenv("DATABASE_PATH", "data/nafah.db")
+    migrate_database(db_path)
@@ -0,0 +1,67 @@
+"""Migration: Add per-row data quality flags to raw_sales."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+
+def migrate_database(db_path: str = "data/nafah.db"):
+    """
+    Migrate database to add amount_ok/qty_ok/name_ok flags to raw_sales.
+    
+    This migration:
+    1. Adds amount_ok, qty_ok and name_ok columns (if not exist)
+    2. Backfills existing rows (zero/empty values count as missing, as the
+       old read-time quality query did)
+    3. Creates the idx_sales_quality index
+    """
+    db_dir = Path(db_path).parent
+    db_dir.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(raw_sales)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'amount_ok' not in columns:
+            print("Adding quality flag columns to raw_sales table...")
+            cursor.execute("ALTER TABLE raw_sales ADD COLUMN amount_ok INTEGER NOT NULL DEFAULT 1")
+            cursor.execute("ALTER TABLE raw_sales ADD COLUMN qty_ok INTEGER NOT NULL DEFAULT 1")
+            cursor.execute("ALTER TABLE raw_sales ADD COLUMN name_ok INTEGER NOT NULL DEFAULT 1")
+            # Same rule as ingest: a value counts as present when non-zero / non-empty
+            cursor.execute("""
+                UPDATE raw_sales SET
+                    amount_ok = CASE WHEN total_amount IS NULL OR total_amount = 0 THEN 0 ELSE 1 END,
+                    qty_ok = CASE WHEN quantity IS NULL OR quantity = 0 THEN 0 ELSE 1 END,
+                    name_ok = CASE WHEN product_name IS NULL OR product_name = '' THEN 0 ELSE 1 END
+            """)
+            print("[OK] Added and backfilled amount_ok, qty_ok and name_ok columns")
+        else:
+            print("[OK] Quality flag columns already exist in raw_sales")
+        
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sales_quality "
+            "ON raw_sales(dataset_id, amount_ok, qty_ok, name_ok)"
+        )
+        print("[OK] idx_sales_quality index present")
+        
+        conn.commit()
+        print(f"\n[OK] Migration completed successfully for {db_path}")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"[ERROR] Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    db_path = os.getenv("DATABASE_PATH", "data/nafah.db")
+    migrate_database(db_path)
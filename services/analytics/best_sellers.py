@@ -39,6 +39,7 @@ async def compute_best_sellers(
     cached = cache.read(dataset_id, cache_key)
     if cached is not None:
         logger.info(f"Returning cached best sellers for dataset {dataset_id}")
+        # Cached frames carry total_amount only; rules and guidance read that key
         return cached.to_dict('records')
     
     # Load sales data
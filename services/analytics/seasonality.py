@@ -2,7 +2,9 @@
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+from bisect import bisect_left
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from storage.database import Database
 from storage.cache import CacheManager
 from utils.logging import setup_logging
@@ -33,7 +35,7 @@ async def compute_seasonality(
     cached = cache.read(dataset_id, cache_key)
     if cached is not None:
         logger.info(f"Returning cached seasonality for dataset {dataset_id}")
-        return cached.to_dict('records')
+        return annotate_next_peak(cached.to_dict('records'))
     
     # Load sales data
     query = """
@@ -107,4 +109,36 @@ async def compute_seasonality(
     
     logger.info(f"Computed seasonality for dataset {dataset_id}: {len(results)} products")
     
+    return annotate_next_peak(results)
+
+
+def annotate_next_peak(
+    results: List[Dict[str, Any]],
+    current_month: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Add next_peak_month and months_to_peak to seasonal products.
+    
+    Only peaks from the current month to December count (no wrap into next
+    year); both fields are None when there is no such peak. Applied on read
+    rather than cached, since the values depend on the current month.
+    peak_months is stored sorted, so the next peak is a binary search.
+    
+    Args:
+        results: Seasonal products with peak_months
+        current_month: Month to measure from (defaults to now)
+        
+    Returns:
+        The same list, with the fields set on each item
+    """
+    if current_month is None:
+        current_month = datetime.now().month
+    
+    for item in results:
+        peak_months = item.get('peak_months', [])
+        idx = bisect_left(peak_months, current_month)
+        next_peak = int(peak_months[idx]) if idx < len(peak_months) else None
+        item['next_peak_month'] = next_peak
+        item['months_to_peak'] = next_peak - current_month if next_peak is not None else None
+    
     return results
@@ -1,24 +1,78 @@
 """File parsers for different formats."""
 
+import functools
+import os
+import re
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from utils.exceptions import IngestionError
 from utils.logging import setup_logging
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
 logger = setup_logging()
 
+# Vyapar CSV header row markers (matched on raw bytes)
+_VYAPAR_HEADER_MARKERS = re.compile(rb"date|invoice|party|item|amount", re.IGNORECASE)
+
+# PDFs with more pages than this are extracted page-parallel in worker processes;
+# below it, a worker's pdfplumber import and per-page reopen cost more than they save
+PDF_PARALLEL_MIN_PAGES = 16
+
+# Worker pool shared by all PDF uploads, started on first use
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Get the shared PDF extraction pool, creating it on first use."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Stop the shared PDF extraction workers (call on application shutdown)."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown()
+        _pdf_executor = None
+
 
 def detect_format(file_path: str) -> str:
     """
     Detect file format from extension and content.
     
+    Results are cached per (path, mtime, size), so re-detecting an
+    unchanged file skips the Excel sheet probe.
+    
     Args:
         file_path: Path to file
         
     Returns:
         Format string: 'csv', 'pdf', 'vyapar', or 'excel'
     """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return _detect_format(file_path)
+    return _detect_format_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _detect_format_cached(file_path: str, mtime_ns: int, size: int) -> str:
+    """Cached detect_format; mtime/size are part of the key for invalidation."""
+    return _detect_format(file_path)
+
+
+def _detect_format(file_path: str) -> str:
+    """Detect file format (uncached)."""
     extension = Path(file_path).suffix.lower()
     filename_lower = Path(file_path).name.lower()
     
@@ -45,6 +99,36 @@ def detect_format(file_path: str) -> str:
         return 'csv'
 
 
+def column_lookup(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Map lowercased column names to original names (first match wins).
+    
+    Reuses the map attached by the parsers in df.attrs while the columns
+    are unchanged, so parser and validator don't both rebuild it.
+    
+    Args:
+        df: Parsed DataFrame
+        
+    Returns:
+        Dictionary of lowercase name -> original column name
+    """
+    cached = df.attrs.get('_lc_to_orig')
+    if cached is not None and df.attrs.get('_lc_columns') == list(df.columns):
+        return cached
+    
+    lc_to_orig = {}
+    for col in df.columns:
+        lc_to_orig.setdefault(str(col).lower(), col)
+    return lc_to_orig
+
+
+def _attach_column_lookup(df: pd.DataFrame) -> pd.DataFrame:
+    """Attach the lowercase column map to df.attrs for the validators."""
+    df.attrs['_lc_to_orig'] = column_lookup(df)
+    df.attrs['_lc_columns'] = list(df.columns)
+    return df
+
+
 def parse_csv(
     file_path: str,
     schema_type: str = "sales"
@@ -76,22 +160,24 @@ def parse_csv(
         except Exception:
             header_row_index = 0
 
-        # Try different encodings
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-        df = None
+        # Fast path: multi-threaded pyarrow reader (UTF-8 only)
+        df = _read_csv_pyarrow(file_path, header_row_index)
         
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(
-                    file_path,
-                    encoding=encoding,
-                    on_bad_lines='skip',
-                    low_memory=False,
-                    skiprows=header_row_index
-                )
-                break
-            except UnicodeDecodeError:
-                continue
+        # Fallback: pandas reader, trying different encodings
+        if df is None:
+            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
+            for encoding in encodings:
+                try:
+                    df = pd.read_csv(
+                        file_path,
+                        encoding=encoding,
+                        on_bad_lines='skip',
+                        low_memory=False,
+                        skiprows=header_row_index
+                    )
+                    break
+                except UnicodeDecodeError:
+                    continue
         
         if df is None:
             raise IngestionError("Failed to parse CSV with any encoding")
@@ -102,7 +188,7 @@ def parse_csv(
         # Log parsing info
         logger.info(f"Parsed CSV: {len(df)} rows, {len(df.columns)} columns (header at row {header_row_index})")
         
-        return df
+        return _attach_column_lookup(df)
         
     except pd.errors.EmptyDataError:
         raise IngestionError("CSV file is empty")
@@ -110,11 +196,120 @@ def parse_csv(
         raise IngestionError(f"Failed to parse CSV: {str(e)}")
 
 
+def _read_csv_pyarrow(file_path: str, skip_rows: int = 0) -> Optional[pd.DataFrame]:
+    """
+    Read a UTF-8 CSV with pyarrow's multi-threaded reader.
+    
+    Empty cells and null markers ('NA', 'null', ...) come back as NaN, as
+    with pandas. Any row with the wrong number of fields makes this return
+    None, so the pandas reader decides how to handle it.
+    
+    Args:
+        file_path: Path to CSV file
+        skip_rows: Number of metadata lines before the header row
+        
+    Returns:
+        Parsed DataFrame, or None if pyarrow is unavailable or the file
+        is not valid UTF-8 or has ragged rows (caller falls back to pandas)
+    """
+    if pacsv is None:
+        return None
+    
+    try:
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(skip_rows=skip_rows, encoding="utf8"),
+            convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=True
+            )
+        )
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return None
+    
+    # Non-UTF-8 text comes back as binary columns; let pandas retry encodings
+    if any(pa.types.is_binary(field.type) for field in table.schema):
+        return None
+    
+    # Plain numpy/object dtypes keep downstream NaN handling unchanged
+    return table.to_pandas()
+
+
+def _table_to_frame(table: List[list]) -> Optional[pd.DataFrame]:
+    """
+    Convert one extracted table (header row + data rows) to a DataFrame.
+    
+    Args:
+        table: Table as returned by pdfplumber's extract_tables
+        
+    Returns:
+        DataFrame of stripped string cells, or None if the table has no data
+    """
+    if len(table) <= 1:  # Needs header + data
+        return None
+    
+    # Use first row as header
+    headers = [str(cell or '').strip() if cell else '' for cell in table[0]]
+    width = len(headers)
+    data = [row[:width] for row in table[1:] if row and any(cell for cell in row if cell)]
+    if not data:
+        return None
+    
+    frame = pd.DataFrame(data, columns=headers)
+    # Repeated header names: keep the right-most column
+    frame = frame.loc[:, ~frame.columns.duplicated(keep='last')]
+    
+    # Vectorized strip; missing cells become ''
+    return frame.astype('string').apply(lambda col: col.str.strip()).fillna('').astype(object)
+
+
+def _extract_page_tables(page) -> List[pd.DataFrame]:
+    """
+    Extract tables from a single pdfplumber page.
+    
+    Args:
+        page: pdfplumber Page
+        
+    Returns:
+        List of DataFrames, one per non-empty table (empty if none found)
+    """
+    frames = []
+    
+    for table in page.extract_tables() or []:
+        frame = _table_to_frame(table)
+        if frame is not None:
+            frames.append(frame)
+    
+    # Pages without tables are skipped; free-text invoice extraction
+    # is not supported yet
+    return frames
+
+
+def _extract_page_tables_from_file(file_path: str, page_num: int) -> List[pd.DataFrame]:
+    """
+    Open a PDF and extract tables from one page.
+    
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    
+    Args:
+        file_path: Path to PDF file
+        page_num: Zero-based page index
+        
+    Returns:
+        List of DataFrames for that page
+    """
+    import pdfplumber
+    
+    with pdfplumber.open(file_path, pages=[page_num + 1]) as pdf:
+        return _extract_page_tables(pdf.pages[0])
+
+
 def parse_pdf(file_path: str) -> pd.DataFrame:
     """
     Parse PDF invoice/report (structured extraction using pdfplumber).
     
-    Extracts tables and text from PDF to identify sales/invoice data.
+    Extracts tables from PDF to identify sales/invoice data. Long documents
+    are extracted in parallel, one page per task on a shared worker pool.
     
     Args:
         file_path: Path to PDF file
@@ -128,42 +323,24 @@ def parse_pdf(file_path: str) -> pd.DataFrame:
     try:
         import pdfplumber
         
-        all_rows = []
-        
         with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # Try to extract tables first (most structured data)
-                tables = page.extract_tables()
-                
-                if tables:
-                    for table in tables:
-                        # Convert table to rows
-                        if len(table) > 1:  # Has header + data
-                            # Use first row as header
-                            headers = [str(cell or '').strip() if cell else '' for cell in table[0]]
-                            # Process data rows
-                            for row in table[1:]:
-                                if row and any(cell for cell in row if cell):
-                                    row_dict = {headers[i]: str(cell or '').strip() if cell else '' 
-                                              for i, cell in enumerate(row) if i < len(headers)}
-                                    if row_dict:
-                                        all_rows.append(row_dict)
-                
-                # If no tables found, try extracting text and searching for patterns
-                if not tables:
-                    text = page.extract_text()
-                    if text:
-                        # Try to find invoice-like patterns in text
-                        # This is a basic implementation - can be enhanced
-                        lines = text.split('\n')
-                        # Look for date patterns, amounts, product names
-                        # For now, we'll return empty and rely on table extraction
-                        pass
-        
-        if not all_rows:
+            n_pages = len(pdf.pages)
+            # Short documents: extracting in-process beats dispatching to workers
+            if n_pages <= PDF_PARALLEL_MIN_PAGES:
+                page_tables = [_extract_page_tables(page) for page in pdf.pages]
+        
+        if n_pages > PDF_PARALLEL_MIN_PAGES:
+            page_tables = list(_get_pdf_executor().map(
+                functools.partial(_extract_page_tables_from_file, file_path),
+                range(n_pages)
+            ))
+        
+        frames = [frame for tables in page_tables for frame in tables]
+        
+        if not frames:
             raise IngestionError("No extractable data found in PDF. Please ensure the PDF contains tables or structured data.")
         
-        df = pd.DataFrame(all_rows)
+        df = pd.concat(frames, ignore_index=True)
         
         # Clean empty rows
         df = df.dropna(how='all')
@@ -173,7 +350,7 @@ def parse_pdf(file_path: str) -> pd.DataFrame:
         
         logger.info(f"Parsed PDF: {len(df)} rows extracted")
         
-        return df
+        return _attach_column_lookup(df)
         
     except ImportError:
         raise IngestionError("PDF parsing requires pdfplumber. Please install: pip install pdfplumber")
@@ -265,7 +442,7 @@ def _parse_vyapar_excel(file_path: str) -> pd.DataFrame:
         if df_sales is None or len(df_sales) == 0:
             raise IngestionError("No sales data found in Vyapar Excel file. Expected sheets: Sales, Sales Invoice, or similar.")
         
-        return df_sales
+        return _attach_column_lookup(df_sales)
         
     except Exception as e:
         raise IngestionError(f"Failed to parse Vyapar Excel file: {str(e)}")
@@ -286,19 +463,15 @@ def _parse_vyapar_csv(file_path: str) -> pd.DataFrame:
     - GST/GST %
     """
     try:
-        # Use the CSV parser but with Vyapar-aware header detection
-        header_row_index = 0
-        
-        # Try to detect header row
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            preview_lines = [next(f) for _ in range(10)]
+        # Use the CSV parser but with Vyapar-aware header detection:
+        # scan the first 10 raw lines for ASCII markers without decoding
+        with open(file_path, "rb") as f:
+            preview_lines = f.read(16384).split(b"\n")[:10]
         
-        for idx, line in enumerate(preview_lines):
-            lower = line.lower()
-            # Vyapar CSV markers
-            if any(marker in lower for marker in ['date', 'invoice', 'party', 'item', 'amount']):
-                header_row_index = idx
-                break
+        header_row_index = next(
+            (idx for idx, line in enumerate(preview_lines) if _VYAPAR_HEADER_MARKERS.search(line)),
+            0
+        )
         
         # Try different encodings
         encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
@@ -325,7 +498,7 @@ def _parse_vyapar_csv(file_path: str) -> pd.DataFrame:
         
         logger.info(f"Parsed Vyapar CSV: {len(df)} rows, {len(df.columns)} columns")
         
-        return df
+        return _attach_column_lookup(df)
         
     except Exception as e:
         raise IngestionError(f"Failed to parse Vyapar CSV: {str(e)}")
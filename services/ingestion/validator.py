@@ -1,8 +1,10 @@
 """Data validation for ingested data."""
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 from utils.exceptions import ValidationError
+from services.ingestion.parser import column_lookup
 from utils.logging import setup_logging
 
 logger = setup_logging()
@@ -52,12 +54,13 @@ def validate_sales_data(df: pd.DataFrame) -> ValidationResult:
     }
     
     # Check for required columns (flexible naming)
+    lc_to_orig = column_lookup(df)
     found_columns = {}
     for required, alternatives in required_columns.items():
         found = None
         for alt in alternatives:
-            if alt.lower() in [col.lower() for col in df.columns]:
-                found = [col for col in df.columns if col.lower() == alt.lower()][0]
+            if alt.lower() in lc_to_orig:
+                found = lc_to_orig[alt.lower()]
                 break
         if not found:
             result.add_error(f"Missing required column: {required} (or alternatives: {alternatives})")
@@ -69,33 +72,42 @@ def validate_sales_data(df: pd.DataFrame) -> ValidationResult:
     # Try to locate optional columns
     for opt, alternatives in optional_columns.items():
         for alt in alternatives:
-            if alt.lower() in [col.lower() for col in df.columns]:
-                found_columns[opt] = [col for col in df.columns if col.lower() == alt.lower()][0]
+            if alt.lower() in lc_to_orig:
+                found_columns[opt] = lc_to_orig[alt.lower()]
                 break
     
-    # Rename columns to standard names
+    # Rename columns to standard names on a shallow copy: only the column
+    # index is rebuilt, the data blocks are shared with the caller's frame
+    # (so df_renamed is treated as read-only below)
     column_mapping = {v: k for k, v in found_columns.items()}
-    df_renamed = df.rename(columns=column_mapping)
+    df_renamed = df.copy(deep=False)
+    df_renamed.columns = [column_mapping.get(col, col) for col in df.columns]
     
     # Validate data types and ranges
     try:
         # Convert date column
-        df_renamed['date'] = pd.to_datetime(df_renamed['date'], errors='coerce')
-        invalid_dates = df_renamed['date'].isna().sum()
+        dates = pd.to_datetime(df_renamed['date'], errors='coerce')
+        invalid_dates = dates.isna().sum()
         if invalid_dates > 0:
             result.add_warning(f"{invalid_dates} rows have invalid dates")
         
-        # Validate numeric columns
-        numeric_cols = ['quantity', 'unit_price', 'total_amount']
-        for col in numeric_cols:
-            if col in df_renamed.columns:
-                df_renamed[col] = pd.to_numeric(df_renamed[col], errors='coerce')
-                invalid = df_renamed[col].isna().sum()
+        # Validate numeric columns in one block: coerce once, then reduce
+        # invalid/negative counts column-wise over a single float matrix
+        numeric_cols = [
+            col for col in ['quantity', 'unit_price', 'total_amount']
+            if col in df_renamed.columns
+        ]
+        if numeric_cols:
+            numeric = df_renamed[numeric_cols].apply(pd.to_numeric, errors='coerce')
+            matrix = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+            invalid_counts = np.isnan(matrix).sum(axis=0)
+            negative_counts = (matrix < 0).sum(axis=0)
+            
+            for col, invalid, negative in zip(numeric_cols, invalid_counts, negative_counts):
                 if invalid > 0:
                     result.add_warning(f"{invalid} rows have invalid {col}")
                 
                 # Check for negative values
-                negative = (df_renamed[col] < 0).sum()
                 if negative > 0:
                     result.add_warning(f"{negative} rows have negative {col} values")
     except Exception as e:
@@ -130,12 +142,13 @@ def validate_inventory_data(df: pd.DataFrame) -> ValidationResult:
     }
     
     # Check for required columns
+    lc_to_orig = column_lookup(df)
     found_columns = {}
     for required, alternatives in required_columns.items():
         found = None
         for alt in alternatives:
-            if alt.lower() in [col.lower() for col in df.columns]:
-                found = [col for col in df.columns if col.lower() == alt.lower()][0]
+            if alt.lower() in lc_to_orig:
+                found = lc_to_orig[alt.lower()]
                 break
         if not found:
             result.add_error(f"Missing required column: {required}")
@@ -173,5 +186,7 @@ def check_duplicates(df: pd.DataFrame, key_fields: List[str]) -> List[int]:
     if not existing_keys:
         return []
     
+    # Hash-based duplicated() beats sort-and-compare-neighbours on string keys;
+    # index the labels directly rather than materializing df[duplicates]
     duplicates = df.duplicated(subset=existing_keys, keep='first')
-    return df[duplicates].index.tolist()
+    return df.index[duplicates.to_numpy()].tolist()
@@ -1,5 +1,6 @@
 """Calculate data quality metrics for insights."""
 
+import json
 from typing import Dict, Any
 from storage.database import Database
 
@@ -11,6 +12,9 @@ async def calculate_data_quality(
     """
     Calculate data quality metrics for a dataset.
     
+    Dataset rows are immutable after ingestion, so the result is stored
+    in datasets.quality_json and later calls are a single-row lookup.
+    
     Args:
         db: Database instance
         dataset_id: Dataset identifier
@@ -20,23 +24,27 @@ async def calculate_data_quality(
     """
     try:
         # Get dataset info
-        dataset_query = "SELECT row_count, created_at FROM datasets WHERE dataset_id = ?"
+        dataset_query = "SELECT row_count, created_at, quality_json FROM datasets WHERE id = ?"
         dataset = await db.execute_query(dataset_query, (dataset_id,), fetch_one=True)
         
         if not dataset:
             return {'completeness': 0.0, 'validity': 0.0, 'recency': 0.0}
         
+        if dataset.get('quality_json'):
+            return json.loads(dataset['quality_json'])
+        
         row_count = dataset.get('row_count', 0)
         
-        # Check for missing/null values in raw_sales
+        # Per-row quality flags are precomputed at ingest time, so this is
+        # plain integer sums (served from idx_sales_quality) with no CASE
         sales_query = """
             SELECT 
                 COUNT(*) as total_rows,
                 COUNT(DISTINCT product_name) as unique_products,
                 COUNT(DISTINCT date) as unique_dates,
-                SUM(CASE WHEN product_name IS NULL OR product_name = '' THEN 1 ELSE 0 END) as null_names,
-                SUM(CASE WHEN total_amount IS NULL OR total_amount = 0 THEN 1 ELSE 0 END) as null_amounts,
-                SUM(CASE WHEN quantity IS NULL OR quantity = 0 THEN 1 ELSE 0 END) as null_quantities
+                SUM(name_ok) as ok_names,
+                SUM(amount_ok) as ok_amounts,
+                SUM(qty_ok) as ok_quantities
             FROM raw_sales
             WHERE dataset_id = ?
         """
@@ -46,9 +54,9 @@ async def calculate_data_quality(
             return {'completeness': 0.0, 'validity': 0.0, 'recency': 0.0}
         
         total_rows = sales_stats['total_rows']
-        null_names = sales_stats.get('null_names', 0)
-        null_amounts = sales_stats.get('null_amounts', 0)
-        null_quantities = sales_stats.get('null_quantities', 0)
+        null_names = total_rows - (sales_stats.get('ok_names') or 0)
+        null_amounts = total_rows - (sales_stats.get('ok_amounts') or 0)
+        null_quantities = total_rows - (sales_stats.get('ok_quantities') or 0)
         
         # Calculate completeness (percentage of non-null critical fields)
         total_fields = total_rows * 3  # product_name, total_amount, quantity
@@ -60,15 +68,11 @@ async def calculate_data_quality(
         unique_products = sales_stats.get('unique_products', 0)
         unique_dates = sales_stats.get('unique_dates', 0)
         
-        validity_score = 0.0
-        if unique_products > 0:
-            validity_score += 0.4  # Has multiple products
-        if unique_dates > 1:
-            validity_score += 0.4  # Has multiple dates
-        if total_rows >= 10:
-            validity_score += 0.2  # Has sufficient data points
-        
-        validity = min(1.0, validity_score)
+        validity = sum((
+            0.4 * (unique_products > 0),  # Has multiple products
+            0.4 * (unique_dates > 1),  # Has multiple dates
+            0.2 * (total_rows >= 10),  # Has sufficient data points
+        ))
         
         # Calculate recency (how fresh is the data)
         # For now, assume data is recent if dataset was created recently
@@ -78,7 +82,7 @@ async def calculate_data_quality(
         # Combine into overall quality score
         overall_quality = (completeness * 0.5) + (validity * 0.3) + (recency * 0.2)
         
-        return {
+        quality = {
             'completeness': round(completeness, 2),
             'validity': round(validity, 2),
             'recency': round(recency, 2),
@@ -88,6 +92,13 @@ async def calculate_data_quality(
             'unique_dates': unique_dates
         }
         
+        await db.execute_write(
+            "UPDATE datasets SET quality_json = ? WHERE id = ?",
+            (json.dumps(quality), dataset_id)
+        )
+        
+        return quality
+        
     except Exception as e:
         # If calculation fails, return conservative defaults
         return {'completeness': 0.5, 'validity': 0.5, 'recency': 1.0, 'overall': 0.6}
@@ -1,7 +1,13 @@
 """Main insights engine."""
 
-import json
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import logging
+import orjson
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Dict, Any, Optional
 from storage.database import Database
 from services.analytics import (
     dead_stock,
@@ -12,18 +18,119 @@ from services.analytics import (
 )
 from services.insights.rules import risk_rules, growth_rules, efficiency_rules
 from services.insights.rules import profitability_rules
-from services.insights.scorer import score_confidence
+from services.insights.scorer import score_confidence_batch
 from services.insights.nafah_guidance import generate_nafah_guidance
 from services.insights.data_quality import calculate_data_quality
-from utils.logging import setup_logging
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
+
+# In-process result caches (LRU with TTL). Generated insights are keyed by
+# (dataset_id, dataset version); stored-insight queries by
+# (dataset_id, category, confidence, limit, offset).
+_INSIGHT_CACHE_SIZE = 256
+_INSIGHT_CACHE_TTL = 300  # seconds
+_generated_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+# Per-dataset counter bumped on every invalidation; part of the version token
+_dataset_versions: Dict[str, int] = {}
+# Generation runs in progress, so concurrent callers share one run
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+
+# Columns returned to API clients (confidence_rank and content_hash are internal)
+INSIGHT_COLUMNS = (
+    "id, dataset_id, insight_id, title, category, confidence, "
+    "supporting_metrics, recommended_action, generated_at, is_active"
+)
+
+
+def _build_insights_query(filters: str) -> str:
+    """Build the stored-insights SELECT with the given extra WHERE filters."""
+    return f"""
+        SELECT {INSIGHT_COLUMNS} FROM insights
+        WHERE dataset_id = ? AND is_active = 1{filters}
+        ORDER BY confidence_rank, generated_at DESC
+        LIMIT ? OFFSET ?
+    """
+
+
+# Metrics may carry numpy scalars or non-string keys straight from analytics
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Sort key stored with each insight so idx_insights_lookup can serve ORDER BY
+_CONFIDENCE_RANK = {'high': 1, 'medium': 2, 'low': 3}
+
+# get_insights statements keyed by (has category filter, has confidence filter)
+_QUERIES = {
+    (False, False): _build_insights_query(""),
+    (True, False): _build_insights_query(" AND category = ?"),
+    (False, True): _build_insights_query(" AND confidence = ?"),
+    (True, True): _build_insights_query(" AND category = ? AND confidence = ?"),
+}
+
+
+def invalidate_insights_cache(dataset_id: str) -> None:
+    """
+    Drop cached insights for a dataset and advance its version.
+    
+    Call whenever the dataset's data changes (ingest, delete).
+    
+    Args:
+        dataset_id: Dataset identifier
+    """
+    _dataset_versions[dataset_id] = _dataset_versions.get(dataset_id, 0) + 1
+    for cached in (_generated_cache, _query_cache):
+        _drop_entries(cached, dataset_id)
+
+
+def _drop_entries(cached: OrderedDict, dataset_id: str) -> None:
+    """Remove every entry of one dataset from a result cache."""
+    for key in [key for key in cached if key[0] == dataset_id]:
+        del cached[key]
+
+
+def _cache_get(cached: OrderedDict, key: tuple) -> Optional[List[Dict[str, Any]]]:
+    """Return an unexpired entry, marking it most recently used."""
+    entry = cached.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del cached[key]
+        return None
+    cached.move_to_end(key)
+    return entry[1]
+
+
+def _cache_put(cached: OrderedDict, key: tuple, value: List[Dict[str, Any]]) -> None:
+    """Store an entry, evicting the least recently used beyond the size bound."""
+    cached[key] = (time.monotonic() + _INSIGHT_CACHE_TTL, value)
+    cached.move_to_end(key)
+    while len(cached) > _INSIGHT_CACHE_SIZE:
+        cached.popitem(last=False)
+
+
+async def _dataset_version(db: Database, dataset_id: str) -> tuple:
+    """
+    Version token for a dataset.
+    
+    The in-process counter changes on every invalidation; status and
+    row_count also cover updates made by other processes, since updated_at
+    alone has one-second resolution.
+    """
+    row = await db.execute_query(
+        "SELECT status, row_count, updated_at FROM datasets WHERE id = ?",
+        (dataset_id,),
+        fetch_one=True
+    )
+    stored = (row['status'], row['row_count'], row['updated_at']) if row else None
+    return (_dataset_versions.get(dataset_id, 0), stored)
 
 
 async def generate_insights(
     db: Database,
     cache,
-    dataset_id: str
+    dataset_id: str,
+    force: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Generate all insights for a dataset.
@@ -32,18 +139,141 @@ async def generate_insights(
         db: Database instance
         cache: Cache manager instance
         dataset_id: Dataset identifier
+        force: Regenerate even if insights for this version are cached
         
     Returns:
         List of generated insights
     """
-    logger.info(f"Generating insights for dataset {dataset_id}")
+    version = await _dataset_version(db, dataset_id)
+    cache_key = (dataset_id, version)
+    if not force:
+        cached = _cache_get(_generated_cache, cache_key)
+        if cached is not None:
+            logger.info("Using cached insights for dataset %s", dataset_id)
+            return cached
+    
+    # Shield so a cancelled request doesn't abort a run other callers share
+    return await asyncio.shield(_start_generation(db, cache, dataset_id, cache_key))
+
+
+async def refresh_insights_in_background(
+    db: Database,
+    cache,
+    dataset_id: str
+) -> None:
+    """
+    Start generating insights (and Nafah Guidance) without waiting for it.
+    
+    Called after ingest so the first request for the dataset is served
+    from cache.
+    
+    Args:
+        db: Database instance
+        cache: Cache manager instance
+        dataset_id: Dataset identifier
+    """
+    version = await _dataset_version(db, dataset_id)
+    cache_key = (dataset_id, version)
+    if _cache_get(_generated_cache, cache_key) is not None:
+        return
+    
+    task = _start_generation(db, cache, dataset_id, cache_key)
+    task.add_done_callback(_log_background_failure)
+
+
+async def get_nafah_guidance(
+    db: Database,
+    cache,
+    dataset_id: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the stored Nafah Guidance report for a completed dataset.
+    
+    Read-only: guidance is written by the post-ingest background run or an
+    explicit generate request, never from here.
+    
+    Args:
+        db: Database instance
+        cache: Cache manager instance
+        dataset_id: Dataset identifier
+        
+    Returns:
+        Guidance insight row, or None if the dataset is missing, not yet
+        completed, or has no guidance stored
+    """
+    dataset = await db.execute_query(
+        "SELECT status FROM datasets WHERE id = ?",
+        (dataset_id,),
+        fetch_one=True
+    )
+    if not dataset or dataset['status'] != 'completed':
+        return None
+    
+    row = await db.execute_query(
+        f"""
+            SELECT {INSIGHT_COLUMNS} FROM insights
+            WHERE dataset_id = ? AND insight_id = 'nafah_guidance_main' AND is_active = 1
+        """,
+        (dataset_id,),
+        fetch_one=True
+    )
+    if row:
+        row['supporting_metrics'] = orjson.loads(row['supporting_metrics'])
+    return row
+
+
+def _start_generation(
+    db: Database,
+    cache,
+    dataset_id: str,
+    cache_key: tuple
+) -> asyncio.Task:
+    """Get the running generation task for a dataset version, starting one if needed."""
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_run_generation(db, cache, dataset_id, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    return task
+
+
+def _log_background_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background insight generation failed: %s", task.exception())
+
+
+async def _run_generation(
+    db: Database,
+    cache,
+    dataset_id: str,
+    cache_key: tuple
+) -> List[Dict[str, Any]]:
+    """Run analytics and rules, store the insights and cache them under cache_key."""
+    logger.info("Generating insights for dataset %s", dataset_id)
     
-    # Load analytics data
-    dead_stock_data = await dead_stock.compute_dead_stock(db, cache, dataset_id)
-    seasonal_data = await seasonality.compute_seasonality(db, cache, dataset_id)
-    best_sellers_data = await best_sellers.compute_best_sellers(db, cache, dataset_id, limit=20)
-    profitability_data = await profitability.compute_profitability(db, cache, dataset_id)
-    inventory_data = await inventory.compute_inventory_velocity(db, cache, dataset_id)
+    # Load analytics data concurrently (each query opens its own connection)
+    (
+        dead_stock_data,
+        seasonal_data,
+        best_sellers_data,
+        profitability_data,
+        inventory_data
+    ) = await asyncio.gather(
+        dead_stock.compute_dead_stock(db, cache, dataset_id),
+        seasonality.compute_seasonality(db, cache, dataset_id),
+        best_sellers.compute_best_sellers(db, cache, dataset_id, limit=20),
+        profitability.compute_profitability(db, cache, dataset_id),
+        inventory.compute_inventory_velocity(db, cache, dataset_id)
+    )
+    
+    # Fill missing/None numeric fields once so rules and guidance can do plain arithmetic
+    _coerce_numeric(profitability_data, ('revenue', 'profit', 'profit_margin'))
+    _coerce_numeric(dead_stock_data, ('days_since_sale', 'current_stock', 'estimated_value'))
+    _coerce_numeric(inventory_data, ('current_stock', 'velocity', 'avg_daily_sales', 'reorder_score'))
+    _coerce_numeric(inventory_data, ('days_of_stock',), default=999.0)
+    
+    # Shared by the profitability rules and Nafah Guidance
+    top10_ids = frozenset(p.get('product_id') for p in islice(best_sellers_data, 10))
     
     insights = []
     
@@ -51,7 +281,9 @@ async def generate_insights(
     insights.extend(risk_rules.evaluate_dead_stock_rule(dead_stock_data))
     
     # Evaluate growth rules
-    insights.extend(growth_rules.evaluate_seasonal_peak_rule(seasonal_data))
+    # One pass over seasonal data serves both the peak insights and the guidance tip
+    seasonal_peaks = growth_rules.process_seasonal_peaks(seasonal_data)
+    insights.extend(seasonal_peaks[1])
     insights.extend(
         growth_rules.evaluate_high_velocity_low_stock_rule(best_sellers_data, inventory_data)
     )
@@ -60,7 +292,7 @@ async def generate_insights(
     insights.extend(efficiency_rules.evaluate_low_margin_rule(profitability_data))
     
     # Evaluate profitability rules
-    insights.extend(profitability_rules.evaluate_high_profit_opportunity(profitability_data, best_sellers_data))
+    insights.extend(profitability_rules.evaluate_high_profit_opportunity(profitability_data, best_sellers_data, top10_ids))
     insights.extend(profitability_rules.evaluate_profit_concentration(best_sellers_data, profitability_data))
     
     # Generate main Nafah Guidance (comprehensive shopkeeper-friendly report)
@@ -69,19 +301,93 @@ async def generate_insights(
         dead_stock_data,
         profitability_data,
         inventory_data,
-        seasonal_data
+        seasonal_data,
+        top10_ids=top10_ids,
+        seasonal_peaks=seasonal_peaks
     )
     insights.insert(0, nafah_guidance)  # Put main guidance first
     
     # Calculate data quality for confidence scoring
     data_quality = await calculate_data_quality(db, dataset_id)
     
-    # Store insights in database
-    for insight in insights:
-        # Calculate final confidence with actual data quality
-        insight['confidence'] = score_confidence(insight, data_quality)
+    # Score and serialize in a worker thread so the CPU work doesn't block the event loop
+    rows = await asyncio.to_thread(_build_insight_rows, dataset_id, insights, data_quality)
+    
+    # Store only new or changed insights, matched on insight_id + content hash
+    existing = await db.execute_query(
+        "SELECT insight_id, content_hash FROM insights WHERE dataset_id = ?",
+        (dataset_id,)
+    )
+    stored_hashes = {row['insight_id']: row['content_hash'] for row in existing}
+    new_rows = [row for row in rows if row[1] not in stored_hashes]
+    changed_rows = [
+        row[2:] + row[:2]  # SET values first, then the WHERE key
+        for row in rows
+        if row[1] in stored_hashes and stored_hashes[row[1]] != row[-1]
+    ]
+    
+    await db.execute_many(
+        """INSERT INTO insights 
+           (dataset_id, insight_id, title, category, confidence, confidence_rank,
+            supporting_metrics, recommended_action, content_hash)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        new_rows
+    )
+    await db.execute_many(
+        """UPDATE insights SET
+               title = ?, category = ?, confidence = ?, confidence_rank = ?,
+               supporting_metrics = ?, recommended_action = ?, content_hash = ?,
+               generated_at = CURRENT_TIMESTAMP, is_active = 1
+           WHERE dataset_id = ? AND insight_id = ?""",
+        changed_rows
+    )
+    
+    # Stored rows changed: drop cached queries, keep the version as is
+    _drop_entries(_query_cache, dataset_id)
+    _drop_entries(_generated_cache, dataset_id)
+    _cache_put(_generated_cache, cache_key, insights)
+    
+    logger.info("Generated %d insights for dataset %s", len(insights), dataset_id)
+    
+    return insights
+
+
+def _coerce_numeric(
+    records: List[Dict[str, Any]],
+    fields: tuple,
+    default: float = 0.0
+) -> None:
+    """Replace missing or None values of the given fields with default, in place."""
+    for item in records:
+        for field in fields:
+            if item.get(field) is None:
+                item[field] = default
+
+
+def _build_insight_rows(
+    dataset_id: str,
+    insights: List[Dict[str, Any]],
+    data_quality: Dict[str, Any]
+) -> List[tuple]:
+    """
+    Score confidence and serialize insights into insights-table rows.
+    
+    Sets each insight's final 'confidence' in place.
+    
+    Args:
+        dataset_id: Dataset identifier
+        insights: Insights from rule evaluation (plus Nafah Guidance)
+        data_quality: Data quality metrics
+        
+    Returns:
+        List of row tuples (dataset_id, insight_id, ..., content_hash)
+    """
+    rows = []
+    # Calculate final confidence with actual data quality
+    confidences = score_confidence_batch(insights, data_quality)
+    for insight, confidence in zip(insights, confidences):
+        insight['confidence'] = confidence
         
-        # Store in database
         # Handle guidance_format for Nafah Guidance
         supporting_metrics = insight.get('supporting_metrics', {})
         if 'guidance_format' in insight:
@@ -93,25 +399,36 @@ async def generate_insights(
             guidance = insight['guidance_format']
             recommended_action = guidance.get('quick_summary', 'Nafah Guidance available')
         
-        await db.execute_write(
-            """INSERT INTO insights 
-               (dataset_id, insight_id, title, category, confidence, 
-                supporting_metrics, recommended_action)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                dataset_id,
-                insight['insight_id'],
-                insight['title'],
-                insight['category'],
-                insight['confidence'],
-                json.dumps(supporting_metrics),
-                recommended_action
-            )
+        metrics_json = orjson.dumps(supporting_metrics, option=_ORJSON_OPTIONS).decode()
+        content_hash = _content_hash(
+            insight['title'],
+            insight['category'],
+            insight['confidence'],
+            metrics_json,
+            recommended_action
         )
-    
-    logger.info(f"Generated {len(insights)} insights for dataset {dataset_id}")
-    
-    return insights
+        
+        rows.append((
+            dataset_id,
+            insight['insight_id'],
+            insight['title'],
+            insight['category'],
+            insight['confidence'],
+            _CONFIDENCE_RANK.get(insight['confidence'], 3),
+            metrics_json,
+            recommended_action,
+            content_hash
+        ))
+    return rows
+
+
+def _content_hash(*fields: str) -> str:
+    """Short digest of an insight's stored fields, used to skip unchanged rows."""
+    digest = hashlib.blake2b(digest_size=16)
+    for field in fields:
+        digest.update(str(field).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
 
 
 async def get_insights(
@@ -136,36 +453,25 @@ async def get_insights(
     Returns:
         List of insights
     """
-    conditions = ["dataset_id = ?", "is_active = 1"]
-    params = [dataset_id]
+    cache_key = (dataset_id, category, confidence, limit, offset)
+    cached = _cache_get(_query_cache, cache_key)
+    if cached is not None:
+        return cached
     
+    params = [dataset_id]
     if category:
-        conditions.append("category = ?")
         params.append(category)
     if confidence:
-        conditions.append("confidence = ?")
         params.append(confidence)
-    
-    where_clause = " AND ".join(conditions)
-    query = f"""
-        SELECT * FROM insights
-        WHERE {where_clause}
-        ORDER BY 
-            CASE confidence 
-                WHEN 'high' THEN 1 
-                WHEN 'medium' THEN 2 
-                WHEN 'low' THEN 3 
-            END,
-            generated_at DESC
-        LIMIT ? OFFSET ?
-    """
     params.extend([limit, offset])
     
+    query = _QUERIES[(bool(category), bool(confidence))]
     rows = await db.execute_query(query, tuple(params))
     
-    # Parse JSON fields
+    # Parse JSON fields (INSIGHT_COLUMNS always includes the TEXT column)
     for row in rows:
-        if 'supporting_metrics' in row and isinstance(row['supporting_metrics'], str):
-            row['supporting_metrics'] = json.loads(row['supporting_metrics'])
+        if metrics := row['supporting_metrics']:
+            row['supporting_metrics'] = orjson.loads(metrics)
     
+    _cache_put(_query_cache, cache_key, rows)
     return rows
@@ -1,8 +1,108 @@
 """Nafah Guidance - Expert AI sales advisor for shopkeepers."""
 
-from typing import List, Dict, Any
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from heapq import nlargest, nsmallest
+from itertools import islice
+from typing import List, Dict, Any, Iterable, FrozenSet, Optional, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+import orjson
+
+from services.insights.rules.growth_rules import process_seasonal_peaks
+
+_MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Memoized reports: input digest -> (expires_at, guidance), oldest first
+_GUIDANCE_CACHE_SIZE = 512
+_GUIDANCE_CACHE_TTL = 300  # seconds
+_guidance_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Message templates, filled per product with str.format
+_URGENT_TEMPLATE = (
+    "🚨 URGENT: Only {stock} units left! Sells {daily:.1f} units/day. "
+    "Stock will run out in {days} days. Order NOW to avoid stockout!"
+)
+_LOW_STOCK_TEMPLATE = "⚠️ Low stock alert: {stock} units remaining. Reorder to maintain 3-week supply."
+_SMART_REORDER_TEMPLATE = (
+    "📊 Smart reorder: High demand detected. Current stock: {stock} units. "
+    "Recommended order: {order} units for 2-week supply."
+)
+_DEAD_HIGH_TEMPLATE = "💰 HIGH VALUE STUCK: ₹{value:,.0f} tied up! Take immediate action:"
+_DEAD_MODERATE_TEMPLATE = "⚠️ Moderate value stuck: ₹{value:,.0f}. Action plan:"
+_DEAD_LOW_TEMPLATE = "📦 Low value stock: ₹{value:,.0f}. Quick action:"
+_SEASONAL_BOOST_TEMPLATE = (
+    "🌦️ SEASONAL BOOST: Expect {boost}% surge in {product} sales this month! "
+    "Stock up now to capitalize."
+)
+_TRENDING_UP_TEMPLATE = (
+    "📈 TRENDING UP: Sales are {percent:.0f}% higher than last month! "
+    "Continue promoting top sellers like '{product}' to maintain momentum."
+)
+_SLOWDOWN_TEMPLATE = (
+    "⚠️ SLOWDOWN ALERT: Sales dropped {percent:.0f}% from last month. "
+    "Take action: {product} needs promotion or bundle deals to recover."
+)
+_STEADY_TEMPLATE = (
+    "✅ STEADY FLOW: {product} sells ~{daily:.0f} units/day consistently. "
+    "Maintain current stock levels and watch for weekly patterns."
+)
+_OPPORTUNITY_TEMPLATE = (
+    "💡 OPPORTUNITY: {product} has room to grow. "
+    "Consider promotional pricing or cross-selling with complementary products."
+)
+_NEXT_WEEK_TEMPLATE = "📊 NEXT 7 DAYS: Projected ~{weekly:.0f} units of {product}. Plan inventory accordingly."
+
+# Shared formatters for table cells
+_FMT_INR = "₹{:,.0f}".format
+_FMT_INT = "{:.0f}".format
+_FMT_PCT = "{:.1f}%".format
+
+
+@dataclass
+class InventoryTable:
+    """Inventory velocity rows stored column-wise, one array per field."""
+    product_ids: np.ndarray
+    product_names: np.ndarray
+    current_stock: np.ndarray
+    avg_daily_sales: np.ndarray
+    days_of_stock: np.ndarray
+    velocity: np.ndarray
+    reorder_score: np.ndarray
+    row_of: Dict[Any, int]
+    
+    @classmethod
+    def from_records(cls, inventory_data: List[Dict[str, Any]]) -> "InventoryTable":
+        """
+        Build the table from inventory velocity records.
+        
+        Args:
+            inventory_data: Inventory velocity data
+            
+        Returns:
+            InventoryTable with a product_id -> row index
+        """
+        def column(field: str, default: Any) -> np.ndarray:
+            return np.array([item.get(field, default) for item in inventory_data], dtype=np.float64)
+        
+        product_ids = np.array([item.get('product_id') for item in inventory_data], dtype=object)
+        return cls(
+            product_ids=product_ids,
+            product_names=np.array([item.get('product_name', 'Unknown') for item in inventory_data], dtype=object),
+            current_stock=column('current_stock', 0),
+            avg_daily_sales=column('avg_daily_sales', 0),
+            days_of_stock=column('days_of_stock', 999),
+            velocity=column('velocity', 0),
+            reorder_score=column('reorder_score', 0),
+            # Later rows win, matching a dict built over the records
+            row_of={product_id: row for row, product_id in enumerate(product_ids)}
+        )
+
 
 def generate_nafah_guidance(
     best_sellers_data: List[Dict[str, Any]],
@@ -10,11 +110,17 @@ def generate_nafah_guidance(
     profitability_data: List[Dict[str, Any]],
     inventory_data: List[Dict[str, Any]],
     seasonal_data: List[Dict[str, Any]],
-    trends_data: Dict[str, Any] = None
+    trends_data: Dict[str, Any] = None,
+    top10_ids: FrozenSet[Any] = None,
+    seasonal_peaks: Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]] = None,
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """
     Generate comprehensive Nafah Guidance report in shopkeeper-friendly format.
     
+    Reports are memoized for a few minutes by a digest of the inputs and the
+    current month, so repeated calls with the same analytics reuse the result.
+    
     Args:
         best_sellers_data: Top selling products
         dead_stock_data: Dead stock items
@@ -22,10 +128,67 @@ def generate_nafah_guidance(
         inventory_data: Inventory velocity data
         seasonal_data: Seasonal patterns
         trends_data: Sales trends data (optional)
+        top10_ids: Product IDs of the top 10 sellers, if the caller already has them
+        seasonal_peaks: process_seasonal_peaks(seasonal_data), if the caller already has it
+        use_cache: Whether to reuse/store a memoized report
         
     Returns:
         Comprehensive guidance insight dict
     """
+    current_month = datetime.now().month
+    if not use_cache:
+        return _build_guidance(
+            best_sellers_data, dead_stock_data, profitability_data,
+            inventory_data, seasonal_data, trends_data, top10_ids, seasonal_peaks, current_month
+        )
+    
+    key = hashlib.blake2b(
+        orjson.dumps(
+            [best_sellers_data, dead_stock_data, profitability_data,
+             inventory_data, seasonal_data, trends_data, current_month],
+            default=str,
+            option=_ORJSON_OPTIONS
+        ),
+        digest_size=16
+    ).digest()
+    now = time.monotonic()
+    cached = _guidance_cache.get(key)
+    if cached is not None and cached[0] > now:
+        _guidance_cache.move_to_end(key)
+        return dict(cached[1])  # callers set 'confidence' on the top-level dict
+    
+    guidance = _build_guidance(
+        best_sellers_data, dead_stock_data, profitability_data,
+        inventory_data, seasonal_data, trends_data, top10_ids, seasonal_peaks, current_month
+    )
+    _guidance_cache[key] = (now + _GUIDANCE_CACHE_TTL, guidance)
+    _guidance_cache.move_to_end(key)
+    while len(_guidance_cache) > _GUIDANCE_CACHE_SIZE:
+        _guidance_cache.popitem(last=False)
+    return dict(guidance)
+
+
+def _build_guidance(
+    best_sellers_data: List[Dict[str, Any]],
+    dead_stock_data: List[Dict[str, Any]],
+    profitability_data: List[Dict[str, Any]],
+    inventory_data: List[Dict[str, Any]],
+    seasonal_data: List[Dict[str, Any]],
+    trends_data: Dict[str, Any],
+    top10_ids: FrozenSet[Any],
+    seasonal_peaks: Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]],
+    current_month: int
+) -> Dict[str, Any]:
+    """Build the guidance report (see generate_nafah_guidance)."""
+    # Lookups shared by the report sections, built once per report
+    inventory_table = InventoryTable.from_records(inventory_data)
+    if top10_ids is None:
+        top10_ids = frozenset(p.get('product_id') for p in islice(best_sellers_data, 10))
+    if seasonal_peaks is None:
+        seasonal_peaks = process_seasonal_peaks(seasonal_data)
+    top5_names = frozenset(p.get('product_name') for p in islice(best_sellers_data, 5))
+    ctx = _guidance_context(seasonal_data, current_month, trends_data)
+    
     guidance = {
         'insight_id': 'nafah_guidance_main',
         'title': "Nafah's Guidance",
@@ -33,17 +196,18 @@ def generate_nafah_guidance(
         'confidence': 'high',
         'guidance_format': {
             'quick_summary': _generate_quick_summary(best_sellers_data, dead_stock_data, profitability_data),
-            'best_sellers_breakdown': _generate_best_sellers_table(best_sellers_data[:5]),
+            'best_sellers_breakdown': _generate_best_sellers_table(islice(best_sellers_data, 5)),
             'action_plan': _generate_action_plan(
                 best_sellers_data,
                 dead_stock_data,
                 profitability_data,
-                inventory_data,
-                seasonal_data
+                seasonal_peaks[0],
+                inventory_table,
+                top10_ids
             ),
-            'forecast': _generate_forecast(best_sellers_data, seasonal_data, trends_data),
+            'forecast': _generate_forecast(best_sellers_data, ctx),
             'next_steps': _generate_next_steps(),
-            'bundle_opportunities': _generate_bundle_opportunities(best_sellers_data, profitability_data)
+            'bundle_opportunities': _generate_bundle_opportunities(best_sellers_data, profitability_data, top5_names)
         }
     }
     
@@ -59,19 +223,16 @@ def _generate_quick_summary(
     if not best_sellers:
         return "Upload your sales data to see Nafah's personalized advice for your shop!"
     
-    # Calculate total revenue (approximate for week)
-    total_revenue = sum(item.get('total_amount', 0) or item.get('total_revenue', 0) for item in best_sellers[:10])
-    
     # Get top 3 products
-    top_3 = [item.get('product_name', 'Unknown') for item in best_sellers[:3]]
+    top_3 = [item.get('product_name', 'Unknown') for item in islice(best_sellers, 3)]
     
     # Get bottom performers (dead stock or low revenue)
     bottom_2 = []
     if dead_stock:
-        bottom_2 = [item.get('product_name', 'Unknown') for item in dead_stock[:2]]
+        bottom_2 = [item.get('product_name', 'Unknown') for item in islice(dead_stock, 2)]
     elif profitability:
         # Find low-revenue items
-        low_revenue = sorted(profitability, key=lambda x: x.get('revenue', 0))[:2]
+        low_revenue = nsmallest(2, profitability, key=lambda x: x.get('revenue', 0))
         bottom_2 = [item.get('product_name', 'Unknown') for item in low_revenue]
     
     stars_str = ", ".join(top_3)
@@ -80,14 +241,14 @@ def _generate_quick_summary(
     return f"Your shop's top performers: {stars_str}. Need attention: {fix_str}."
 
 
-def _generate_best_sellers_table(best_sellers: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def _generate_best_sellers_table(best_sellers: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
     """Generate best-sellers breakdown table."""
     table = []
     
     for item in best_sellers:
         product_name = item.get('product_name', 'Unknown')
         total_qty = item.get('total_quantity', 0)
-        total_revenue = item.get('total_amount', 0) or item.get('total_revenue', 0)
+        total_revenue = item.get('total_amount', 0)
         
         # Determine trend (simplified - could be improved with actual trend data)
         if total_qty > 100:
@@ -99,22 +260,128 @@ def _generate_best_sellers_table(best_sellers: List[Dict[str, Any]]) -> List[Dic
         
         table.append({
             'product': product_name,
-            'sold': f"{total_qty:.0f}",
-            'revenue': f"₹{total_revenue:,.0f}",
+            'sold': _FMT_INT(total_qty),
+            'revenue': _FMT_INR(total_revenue),
             'trend': trend
         })
     
     return table
 
 
+def _match_inventory_rows(
+    products: Iterable[Dict[str, Any]],
+    inventory: InventoryTable
+) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]:
+    """
+    Join best-seller rows to their inventory table rows.
+    
+    Args:
+        products: Best-seller rows, in rank order
+        inventory: Inventory table for the same dataset
+        
+    Returns:
+        Tuple of (products with inventory, their rank positions, aligned inventory row indices)
+    """
+    matched = []
+    positions = []
+    rows = []
+    for position, product in enumerate(products):
+        product_id = product.get('product_id')
+        row = inventory.row_of.get(product_id) if product_id else None
+        if row is not None:
+            matched.append(product)
+            positions.append(position)
+            rows.append(row)
+    return matched, np.array(positions, dtype=np.intp), np.array(rows, dtype=np.intp)
+
+
+def _keep_most_urgent(candidates: Dict[Any, Dict[str, Any]], product_id: Any, candidate: Dict[str, Any]) -> None:
+    """Store candidate for product_id unless a more urgent one is already there."""
+    current = candidates.get(product_id)
+    if current is None or candidate['urgency_score'] > current['urgency_score']:
+        candidates[product_id] = candidate
+
+
+def _generate_buy_now(
+    best_sellers: List[Dict[str, Any]],
+    inventory: InventoryTable
+) -> List[Dict[str, Any]]:
+    """Generate Buy Now candidates, keeping the most urgent reason per product."""
+    candidates = {}  # product_id -> most urgent candidate
+    
+    # Strategies 1 and 2 share one join over the top 25 sellers:
+    # 1. High velocity + low stock among the top 15 (top sellers running out)
+    # 2. Very low stock among the next tier (ranks 11-25)
+    products, positions, rows = _match_inventory_rows(islice(best_sellers, 25), inventory)
+    if rows.size:
+        stock = inventory.current_stock[rows]
+        velocity = inventory.velocity[rows]
+        avg_daily = inventory.avg_daily_sales[rows]
+        days_of_stock = inventory.days_of_stock[rows]
+        qty_sold = np.array([p.get('total_quantity', 0) for p in products], dtype=np.float64)
+        
+        urgent = (
+            (positions < 15)
+            & ((stock < qty_sold * 0.2) | (days_of_stock < 14) | (stock == 0))
+            & (velocity > 0)
+        )
+        low_stock = (
+            (positions >= 10)
+            & (stock > 0) & (days_of_stock < 21) & (velocity > 0) & (qty_sold > 10)
+        )
+        urgent_quantity = np.maximum(qty_sold * 0.3, avg_daily * 14)
+        urgent_score = np.where(days_of_stock < 30, 100 - days_of_stock, 50)
+        
+        for i in np.flatnonzero(urgent | low_stock):
+            product_id = products[i].get('product_id')
+            product_name = products[i].get('product_name', 'Unknown')
+            if urgent[i]:
+                _keep_most_urgent(candidates, product_id, {
+                    'item': product_name,
+                    'quantity': f"{int(urgent_quantity[i])} units",
+                    'reason': _URGENT_TEMPLATE.format(
+                        stock=int(stock[i]), daily=avg_daily[i], days=int(days_of_stock[i])
+                    ),
+                    'priority': 'high',
+                    'urgency_score': urgent_score[i]
+                })
+            if low_stock[i]:
+                _keep_most_urgent(candidates, product_id, {
+                    'item': product_name,
+                    'quantity': f"{int(avg_daily[i] * 21)} units",
+                    'reason': _LOW_STOCK_TEMPLATE.format(stock=int(stock[i])),
+                    'priority': 'medium',
+                    'urgency_score': 70 - days_of_stock[i]
+                })
+    
+    # Strategy 3: Products with high reorder score from inventory intelligence
+    for row in np.flatnonzero(inventory.reorder_score >= 60):
+        avg_daily = inventory.avg_daily_sales[row]
+        order_units = int(avg_daily * 14)
+        
+        _keep_most_urgent(candidates, inventory.product_ids[row], {
+            'item': inventory.product_names[row],
+            'quantity': f"{order_units} units" if avg_daily > 0 else "Review stock",
+            'reason': _SMART_REORDER_TEMPLATE.format(
+                stock=int(inventory.current_stock[row]), order=order_units
+            ),
+            'priority': 'medium',
+            'urgency_score': inventory.reorder_score[row]
+        })
+    
+    # Take the 8 most urgent
+    return nlargest(8, candidates.values(), key=lambda x: x['urgency_score'])
+
+
 def _generate_action_plan(
     best_sellers: List[Dict[str, Any]],
     dead_stock: List[Dict[str, Any]],
     profitability: List[Dict[str, Any]],
-    inventory: List[Dict[str, Any]],
-    seasonal: List[Dict[str, Any]]
+    tip_item: Optional[Dict[str, Any]],
+    inventory: InventoryTable,
+    top10_ids: FrozenSet[Any]
 ) -> Dict[str, Any]:
-    """Generate action plan sections."""
+    """Generate action plan sections (inventory/top10_ids are prepared by the caller)."""
     action_plan = {
         'buy_now': [],
         'promote_these': [],
@@ -123,147 +390,85 @@ def _generate_action_plan(
     }
     
     # Buy Now: Multiple criteria for better recommendations
-    inventory_lookup = {item.get('product_id'): item for item in inventory}
-    buy_candidates = []
-    
-    # Strategy 1: High velocity + low stock (top sellers running out)
-    for product in best_sellers[:15]:
-        product_id = product.get('product_id')
-        if product_id and product_id in inventory_lookup:
-            stock = inventory_lookup[product_id].get('current_stock', 0)
-            velocity = inventory_lookup[product_id].get('velocity', 0)
-            qty_sold = product.get('total_quantity', 0)
-            avg_daily = inventory_lookup[product_id].get('avg_daily_sales', 0)
-            days_of_stock = inventory_lookup[product_id].get('days_of_stock', 999)
-            
-            # Multiple conditions for buying
-            if (stock < qty_sold * 0.2 or days_of_stock < 14 or stock == 0) and velocity > 0:
-                buy_candidates.append({
-                    'item': product.get('product_name', 'Unknown'),
-                    'quantity': f"{int(max(qty_sold * 0.3, avg_daily * 14))} units",
-                    'reason': f"🚨 URGENT: Only {int(stock)} units left! Sells {avg_daily:.1f} units/day. Stock will run out in {int(days_of_stock)} days. Order NOW to avoid stockout!",
-                    'priority': 'high',
-                    'urgency_score': 100 - days_of_stock if days_of_stock < 30 else 50
-                })
-    
-    # Strategy 2: Medium velocity products with very low stock
-    for product in best_sellers[10:25]:  # Next tier sellers
-        product_id = product.get('product_id')
-        if product_id and product_id in inventory_lookup:
-            stock = inventory_lookup[product_id].get('current_stock', 0)
-            velocity = inventory_lookup[product_id].get('velocity', 0)
-            qty_sold = product.get('total_quantity', 0)
-            avg_daily = inventory_lookup[product_id].get('avg_daily_sales', 0)
-            days_of_stock = inventory_lookup[product_id].get('days_of_stock', 999)
-            
-            if stock > 0 and days_of_stock < 21 and velocity > 0 and qty_sold > 10:
-                buy_candidates.append({
-                    'item': product.get('product_name', 'Unknown'),
-                    'quantity': f"{int(avg_daily * 21)} units",
-                    'reason': f"⚠️ Low stock alert: {int(stock)} units remaining. Reorder to maintain 3-week supply.",
-                    'priority': 'medium',
-                    'urgency_score': 70 - days_of_stock
-                })
-    
-    # Strategy 3: Products with high reorder score from inventory intelligence
-    for item in inventory:
-        reorder_score = item.get('reorder_score', 0)
-        product_id = item.get('product_id')
-        product_name = item.get('product_name', 'Unknown')
-        
-        # Skip if already in buy_candidates
-        if any(c['item'] == product_name for c in buy_candidates):
-            continue
-            
-        if reorder_score >= 60:
-            stock = item.get('current_stock', 0)
-            avg_daily = item.get('avg_daily_sales', 0)
-            days_of_stock = item.get('days_of_stock', 999)
-            
-            buy_candidates.append({
-                'item': product_name,
-                'quantity': f"{int(avg_daily * 14)} units" if avg_daily > 0 else "Review stock",
-                'reason': f"📊 Smart reorder: High demand detected. Current stock: {int(stock)} units. Recommended order: {int(avg_daily * 14)} units for 2-week supply.",
-                'priority': 'medium',
-                'urgency_score': reorder_score
-            })
-    
-    # Sort by urgency and take top 8
-    buy_candidates.sort(key=lambda x: x.get('urgency_score', 0), reverse=True)
-    action_plan['buy_now'] = buy_candidates[:8]
+    # (nothing to reorder before the first inventory upload)
+    if inventory.row_of:
+        action_plan['buy_now'] = _generate_buy_now(best_sellers, inventory)
     
     # Promote These: High margin products not in top sellers with specific actions
-    top_seller_ids = {p.get('product_id') for p in best_sellers[:10]}
     promote_candidates = []
     
-    for item in profitability[:30]:
-        product_id = item.get('product_id')
+    for item in islice(profitability, 30):
         margin = item.get('profit_margin', 0)
         revenue = item.get('revenue', 0)
+        if not (margin > 15 and item.get('product_id') not in top10_ids and revenue > 2000):
+            continue
         product_name = item.get('product_name', 'Unknown')
-        
-        if margin > 15 and product_id not in top_seller_ids and revenue > 2000:
-            # Determine promotion strategy based on margin
-            if margin > 30:
-                strategy = f"🌟 PREMIUM MARGIN ({margin:.0f}%): This is a profit goldmine!"
-                actions = [
-                    f"1. Move to eye-level shelf (chest to eye height)",
-                    f"2. Create 'Featured Product' display near entrance",
-                    f"3. Train staff to recommend this product",
-                    f"4. Consider small bundle: Buy 2 get 10% off"
-                ]
-            elif margin > 25:
-                strategy = f"💎 HIGH MARGIN ({margin:.0f}%): Great profit opportunity!"
-                actions = [
-                    f"1. Place next to checkout counter",
-                    f"2. Add 'Best Value' tag",
-                    f"3. Mention in customer conversations"
-                ]
-            else:
-                strategy = f"✅ GOOD MARGIN ({margin:.0f}%): Boost visibility!"
-                actions = [
-                    f"1. Display in high-traffic area",
-                    f"2. Pair with complementary best-seller"
-                ]
             
-            promote_candidates.append({
-                'item': product_name,
-                'margin': f"{margin:.1f}%",
-                'revenue': f"₹{revenue:,.0f}",
-                'suggestion': f"{strategy}\n" + "\n".join(actions),
-                'priority_score': margin * (revenue / 1000)  # Higher margin + revenue = higher priority
-            })
+        # Determine promotion strategy based on margin
+        if margin > 30:
+            strategy = f"🌟 PREMIUM MARGIN ({margin:.0f}%): This is a profit goldmine!"
+            actions = [
+                f"1. Move to eye-level shelf (chest to eye height)",
+                f"2. Create 'Featured Product' display near entrance",
+                f"3. Train staff to recommend this product",
+                f"4. Consider small bundle: Buy 2 get 10% off"
+            ]
+        elif margin > 25:
+            strategy = f"💎 HIGH MARGIN ({margin:.0f}%): Great profit opportunity!"
+            actions = [
+                f"1. Place next to checkout counter",
+                f"2. Add 'Best Value' tag",
+                f"3. Mention in customer conversations"
+            ]
+        else:
+            strategy = f"✅ GOOD MARGIN ({margin:.0f}%): Boost visibility!"
+            actions = [
+                f"1. Display in high-traffic area",
+                f"2. Pair with complementary best-seller"
+            ]
+            
+        promote_candidates.append({
+            'item': product_name,
+            'margin': _FMT_PCT(margin),
+            'revenue': _FMT_INR(revenue),
+            'suggestion': f"{strategy}\n" + "\n".join(actions),
+            'priority_score': margin * (revenue / 1000)  # Higher margin + revenue = higher priority
+        })
     
-    # Sort by priority and take top 5
-    promote_candidates.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
-    action_plan['promote_these'] = promote_candidates[:5]
+    # Take the top 5 by priority
+    action_plan['promote_these'] = nlargest(5, promote_candidates, key=lambda x: x.get('priority_score', 0))
     
     # Cut These: Dead stock items with actionable steps
     total_dead_value = 0
-    for item in dead_stock[:8]:  # Show more items
-        days = item.get('days_since_sale', 0)
-        value = item.get('estimated_value', 0)
-        stock = item.get('current_stock', 0)
-        product_name = item.get('product_name', 'Unknown')
-        
-        if days > 90 and stock > 0:
+    if dead_stock:
+        bundle_partner = best_sellers[0].get('product_name', 'top seller') if best_sellers else 'best-seller'
+        stale_items = (
+            item for item in islice(dead_stock, 8)  # Show more items
+            if item.get('days_since_sale', 0) > 90 and item.get('current_stock', 0) > 0
+        )
+        for item in islice(stale_items, 5):
+            days = item.get('days_since_sale', 0)
+            value = item.get('estimated_value', 0)
+            stock = item.get('current_stock', 0)
+            product_name = item.get('product_name', 'Unknown')
+            
             # Determine action based on value and days
             if value > 10000:
-                action = f"💰 HIGH VALUE STUCK: ₹{value:,.0f} tied up! Take immediate action:"
+                action = _DEAD_HIGH_TEMPLATE.format(value=value)
                 steps = [
                     f"1. Offer 20-25% discount this week",
-                    f"2. Create bundle: Pair with '{best_sellers[0].get('product_name', 'top seller') if best_sellers else 'best-seller'}' at 15% off bundle",
+                    f"2. Create bundle: Pair with '{bundle_partner}' at 15% off bundle",
                     f"3. If no movement in 2 weeks, increase discount to 30-35%"
                 ]
             elif value > 5000:
-                action = f"⚠️ Moderate value stuck: ₹{value:,.0f}. Action plan:"
+                action = _DEAD_MODERATE_TEMPLATE.format(value=value)
                 steps = [
                     f"1. Display prominently near checkout counter",
                     f"2. Offer 15-20% discount",
                     f"3. Bundle with fast-moving items"
                 ]
             else:
-                action = f"📦 Low value stock: ₹{value:,.0f}. Quick action:"
+                action = _DEAD_LOW_TEMPLATE.format(value=value)
                 steps = [
                     f"1. Offer 20% discount immediately",
                     f"2. Consider clearance sale if no movement in 1 week"
@@ -272,53 +477,41 @@ def _generate_action_plan(
             action_plan['cut_these'].append({
                 'item': product_name,
                 'days': f"{int(days)} days",
-                'value': f"₹{value:,.0f}",
+                'value': _FMT_INR(value),
                 'stock': f"{int(stock)} units",
                 'suggestion': f"{action}\n" + "\n".join(steps)
             })
             total_dead_value += value
-            
-            if len(action_plan['cut_these']) >= 5:
-                break
     
-    # Seasonal Tip
-    current_month = datetime.now().month
-    for item in seasonal:
-        peak_months = item.get('peak_months', [])
-        seasonality_score = item.get('seasonality_score', 0)
-        
-        if seasonality_score > 0.6 and peak_months:
-            # Find next peak
-            next_peak = None
-            for peak_month in sorted(peak_months):
-                if peak_month >= current_month:
-                    next_peak = peak_month
-                    break
-            
-            if next_peak:
-                months_away = next_peak - current_month
-                if months_away <= 2:
-                    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                    action_plan['seasonal_tip'] = (
-                        f"🌦️ Peak season for {item.get('product_name', 'seasonal items')} "
-                        f"approaching in {months_away} month(s)! Stock up by {month_names[next_peak-1]} "
-                        f"to catch the {seasonality_score*100:.0f}% demand surge."
-                    )
-                    break
+    # Seasonal Tip: first strongly seasonal product whose next peak is at most
+    # 2 months away (found by process_seasonal_peaks)
+    if tip_item:
+        next_peak = tip_item['next_peak_month']
+        action_plan['seasonal_tip'] = (
+            f"🌦️ Peak season for {tip_item.get('product_name', 'seasonal items')} "
+            f"approaching in {tip_item['months_to_peak']} month(s)! Stock up by {_MONTH_NAMES[next_peak-1]} "
+            f"to catch the {tip_item['seasonality_score']*100:.0f}% demand surge."
+        )
     
     return action_plan
 
 
-def _generate_forecast(
-    best_sellers: List[Dict[str, Any]],
+def _guidance_context(
     seasonal: List[Dict[str, Any]],
+    current_month: int,
     trends: Dict[str, Any] = None
-) -> str:
-    """Generate intelligent sales forecast using trends and patterns."""
-    if not best_sellers:
-        return "Upload data to see sales forecasts!"
+) -> Dict[str, Any]:
+    """
+    Derive the trend and seasonal signals shared by the report sections.
     
+    Args:
+        seasonal: Seasonal patterns
+        current_month: Month number (1-12) the report is generated for
+        trends: Sales trends data (optional)
+        
+    Returns:
+        Dict with trend_direction, trend_percent, seasonal_boost and current_month
+    """
     # Use trends data if available
     trend_direction = None
     trend_percent = 0
@@ -338,7 +531,6 @@ def _generate_forecast(
                     trend_direction = "stable"
     
     # Check for seasonal spike
-    current_month = datetime.now().month
     seasonal_boost = None
     for item in seasonal:
         peak_months = item.get('peak_months', [])
@@ -351,6 +543,23 @@ def _generate_forecast(
             }
             break
     
+    return {
+        'trend_direction': trend_direction,
+        'trend_percent': trend_percent,
+        'seasonal_boost': seasonal_boost,
+        'current_month': current_month
+    }
+
+
+def _generate_forecast(best_sellers: List[Dict[str, Any]], ctx: Dict[str, Any]) -> str:
+    """Generate intelligent sales forecast using trends and patterns (ctx from _guidance_context)."""
+    if not best_sellers:
+        return "Upload data to see sales forecasts!"
+    
+    trend_direction = ctx['trend_direction']
+    trend_percent = ctx['trend_percent']
+    seasonal_boost = ctx['seasonal_boost']
+    
     # Build forecast message
     top_product = best_sellers[0]
     product_name = top_product.get('product_name', 'top products')
@@ -360,33 +569,21 @@ def _generate_forecast(
     forecast_parts = []
     
     if seasonal_boost:
-        forecast_parts.append(
-            f"🌦️ SEASONAL BOOST: Expect {seasonal_boost['boost']}% surge in {seasonal_boost['product']} sales this month! Stock up now to capitalize."
-        )
+        forecast_parts.append(_SEASONAL_BOOST_TEMPLATE.format_map(seasonal_boost))
     
     if trend_direction == "growing":
-        forecast_parts.append(
-            f"📈 TRENDING UP: Sales are {trend_percent:.0f}% higher than last month! Continue promoting top sellers like '{product_name}' to maintain momentum."
-        )
+        forecast_parts.append(_TRENDING_UP_TEMPLATE.format(percent=trend_percent, product=product_name))
     elif trend_direction == "declining":
-        forecast_parts.append(
-            f"⚠️ SLOWDOWN ALERT: Sales dropped {trend_percent:.0f}% from last month. Take action: {product_name} needs promotion or bundle deals to recover."
-        )
+        forecast_parts.append(_SLOWDOWN_TEMPLATE.format(percent=trend_percent, product=product_name))
     elif avg_daily > 10:
-        forecast_parts.append(
-            f"✅ STEADY FLOW: {product_name} sells ~{avg_daily:.0f} units/day consistently. Maintain current stock levels and watch for weekly patterns."
-        )
+        forecast_parts.append(_STEADY_TEMPLATE.format(product=product_name, daily=avg_daily))
     else:
-        forecast_parts.append(
-            f"💡 OPPORTUNITY: {product_name} has room to grow. Consider promotional pricing or cross-selling with complementary products."
-        )
+        forecast_parts.append(_OPPORTUNITY_TEMPLATE.format(product=product_name))
     
     # Add actionable forecast
     if avg_daily > 0:
         weekly_estimate = avg_daily * 7
-        forecast_parts.append(
-            f"📊 NEXT 7 DAYS: Projected ~{weekly_estimate:.0f} units of {product_name}. Plan inventory accordingly."
-        )
+        forecast_parts.append(_NEXT_WEEK_TEMPLATE.format(weekly=weekly_estimate, product=product_name))
     
     return " | ".join(forecast_parts) if forecast_parts else "Monitor your sales patterns to optimize inventory and promotions."
 
@@ -402,23 +599,25 @@ def _generate_next_steps() -> str:
     return " | ".join(steps)
 
 
-def _generate_bundle_opportunities(best_sellers: List[Dict[str, Any]], profitability: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    """Identify products that could be bundled together."""
+def _generate_bundle_opportunities(
+    best_sellers: List[Dict[str, Any]],
+    profitability: List[Dict[str, Any]],
+    top5_names: FrozenSet[Any]
+) -> List[Dict[str, str]]:
+    """Identify products that could be bundled together (top5_names: top-5 seller names)."""
     bundles = []
     
     # Simple heuristic: Pair high-margin with slow-moving products
-    top_seller_names = {p.get('product_name') for p in best_sellers[:5]}
-    
-    profitability_sorted = sorted(profitability, key=lambda x: x.get('revenue', 0), reverse=True)
+    top_revenue = nlargest(15, profitability, key=lambda x: x.get('revenue', 0))
     
     # Find slow-moving but high-margin products
-    for item in profitability_sorted[:15]:
+    for item in top_revenue:
         product_name = item.get('product_name', '')
         revenue = item.get('revenue', 0)
         margin = item.get('profit_margin', 0)
         
         # Not a top seller but has decent revenue and margin
-        if product_name not in top_seller_names and margin > 15 and revenue > 2000:
+        if product_name not in top5_names and margin > 15 and revenue > 2000:
             # Suggest bundling with a top seller
             if best_sellers:
                 top_seller = best_sellers[0].get('product_name', 'items')
@@ -0,0 +1,37 @@
+"""Vectorized row filters shared by the insight rules."""
+
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Callable
+
+
+def filter_records(
+    records: List[Dict[str, Any]],
+    defaults: Dict[str, Any],
+    condition: Callable[[pd.DataFrame], pd.Series]
+) -> List[Dict[str, Any]]:
+    """
+    Select the records matching a vectorized condition.
+    
+    The thresholds are evaluated as column masks over a DataFrame of the
+    needed fields; the original dicts of matching rows are returned, so
+    rules format insights from the same values as before.
+    
+    Args:
+        records: Analytics rows (uniform dicts)
+        defaults: Fields the condition reads, with the value to use when a field is absent
+        condition: Function mapping the frame to a boolean mask
+        
+    Returns:
+        Matching records, in input order
+    """
+    if not records:
+        return []
+    
+    frame = pd.DataFrame(records)
+    for column, default in defaults.items():
+        if column not in frame.columns:
+            frame[column] = default
+    
+    mask = condition(frame).to_numpy(dtype=bool)
+    return [records[i] for i in np.flatnonzero(mask)]
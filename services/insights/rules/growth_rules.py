@@ -1,55 +1,74 @@
 """Growth opportunity rules."""
 
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 
 
-def evaluate_seasonal_peak_rule(seasonal_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _build_seasonal_peak_insight(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the peak-season insight for one seasonal product."""
+    peak_months = item.get('peak_months', [])
+    seasonality_score = item.get('seasonality_score', 0)
+    months_until_peak = item['months_to_peak']
+    
+    return {
+        'insight_id': f"seasonal_peak_{item.get('product_id', 'unknown')}",
+        'title': f"Seasonal Peak Approaching: {item.get('product_name', 'Unknown')}",
+        'category': 'growth',
+        'confidence': 'high' if seasonality_score > 0.7 else 'medium',
+        'supporting_metrics': {
+            'seasonality_score': seasonality_score,
+            'peak_months': peak_months,
+            'months_until_peak': months_until_peak
+        },
+        'recommended_action': (
+            f"Prepare inventory for {item.get('product_name')} as peak season "
+            f"approaches in {months_until_peak} month(s)"
+        ),
+        'match_strength': seasonality_score,
+        'significance': 0.8 if months_until_peak == 1 else 0.6
+    }
+
+
+def process_seasonal_peaks(
+    seasonal_data: List[Dict[str, Any]]
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Evaluate seasonal peak opportunity rule.
+    Scan seasonal products approaching their peak in a single pass.
     
     Args:
         seasonal_data: List of seasonal products from analytics
         
     Returns:
-        List of insights
+        Tuple of (first strongly seasonal item for the guidance tip, or None;
+        seasonal peak insights)
     """
+    tip_item = None
     insights = []
     
-    # Get current month (1-12)
-    from datetime import datetime
-    current_month = datetime.now().month
-    
+    # Check if approaching peak season (within 1-2 months);
+    # months_to_peak is set by compute_seasonality from the sorted peak months
     for item in seasonal_data:
-        peak_months = item.get('peak_months', [])
-        seasonality_score = item.get('seasonality_score', 0)
-        
-        # Check if approaching peak season (within 1-2 months)
-        months_until_peak = None
-        for peak_month in peak_months:
-            if peak_month >= current_month:
-                months_until_peak = peak_month - current_month
-                break
-        
-        if months_until_peak is not None and months_until_peak <= 2:
-            insights.append({
-                'insight_id': f"seasonal_peak_{item.get('product_id', 'unknown')}",
-                'title': f"Seasonal Peak Approaching: {item.get('product_name', 'Unknown')}",
-                'category': 'growth',
-                'confidence': 'high' if seasonality_score > 0.7 else 'medium',
-                'supporting_metrics': {
-                    'seasonality_score': seasonality_score,
-                    'peak_months': peak_months,
-                    'months_until_peak': months_until_peak
-                },
-                'recommended_action': (
-                    f"Prepare inventory for {item.get('product_name')} as peak season "
-                    f"approaches in {months_until_peak} month(s)"
-                ),
-                'match_strength': seasonality_score,
-                'significance': 0.8 if months_until_peak == 1 else 0.6
-            })
+        months_to_peak = item.get('months_to_peak')
+        if months_to_peak is None or months_to_peak > 2:
+            continue
+        insights.append(_build_seasonal_peak_insight(item))
+        if tip_item is None and item.get('seasonality_score', 0) > 0.6:
+            tip_item = item
     
-    return insights
+    return tip_item, insights
+
+
+def evaluate_seasonal_peak_rule(seasonal_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Evaluate seasonal peak opportunity rule.
+    
+    Args:
+        seasonal_data: List of seasonal products from analytics
+        
+    Returns:
+        List of insights
+    """
+    return process_seasonal_peaks(seasonal_data)[1]
 
 
 def evaluate_high_velocity_low_stock_rule(
@@ -68,13 +87,13 @@ def evaluate_high_velocity_low_stock_rule(
     """
     insights = []
     
-    # Create inventory lookup
-    inventory_lookup = {item['product_id']: item for item in inventory_data}
+    # Create stock lookup (the only inventory field this rule reads)
+    stock_lookup = {item['product_id']: item.get('current_stock', 0) for item in inventory_data}
     
-    for product in best_sellers[:10]:  # Top 10 sellers
+    for product in islice(best_sellers, 10):  # Top 10 sellers
         product_id = product.get('product_id')
-        if product_id in inventory_lookup:
-            stock = inventory_lookup[product_id].get('current_stock', 0)
+        if product_id in stock_lookup:
+            stock = stock_lookup[product_id]
             quantity_sold = product.get('total_quantity', 0)
             
             # Low stock relative to sales velocity
@@ -1,50 +1,68 @@
 """Profitability optimization rules."""
 
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, FrozenSet
+from services.insights.rules.filters import filter_records
 
 
-def evaluate_high_profit_opportunity(profitability_data: List[Dict[str, Any]], best_sellers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _build_high_profit_insight(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the promotion insight for one high-margin product."""
+    profit_margin = item.get('profit_margin', 0)
+    revenue = item.get('revenue', 0)
+    product_id = item.get('product_id')
+    
+    return {
+        'insight_id': f"high_profit_opportunity_{product_id}",
+        'title': f"Promote High-Margin Product: {item.get('product_name', 'Unknown')}",
+        'category': 'growth',
+        'confidence': 'medium',
+        'supporting_metrics': {
+            'profit_margin': profit_margin,
+            'revenue': revenue,
+            'profit': item.get('profit', 0)
+        },
+        'recommended_action': (
+            f"{item.get('product_name')} has {profit_margin:.1f}% profit margin but isn't in top sellers. "
+            f"Consider promoting it more to increase overall profitability."
+        ),
+        'match_strength': min(profit_margin / 50, 1.0),
+        'significance': min(revenue / 30000, 1.0)
+    }
+
+
+def evaluate_high_profit_opportunity(
+    profitability_data: List[Dict[str, Any]],
+    best_sellers: List[Dict[str, Any]],
+    top10_ids: FrozenSet[Any] = None
+) -> List[Dict[str, Any]]:
     """
     Identify high-profit products that could be promoted more.
     
     Args:
         profitability_data: Profitability rankings
         best_sellers: Top selling products
+        top10_ids: Product IDs of the top 10 sellers, if the caller already has them
         
     Returns:
         List of insights
     """
-    insights = []
-    
     # Get top sellers IDs
-    top_seller_ids = {p.get('product_id') for p in best_sellers[:10]}
+    top_seller_ids = top10_ids
+    if top_seller_ids is None:
+        top_seller_ids = frozenset(p.get('product_id') for p in islice(best_sellers, 10))
     
-    for item in profitability_data:
-        profit_margin = item.get('profit_margin', 0)
-        revenue = item.get('revenue', 0)
-        product_id = item.get('product_id')
-        
-        # High margin products not in top sellers
-        if profit_margin > 20 and revenue > 5000 and product_id not in top_seller_ids:
-            insights.append({
-                'insight_id': f"high_profit_opportunity_{product_id}",
-                'title': f"Promote High-Margin Product: {item.get('product_name', 'Unknown')}",
-                'category': 'growth',
-                'confidence': 'medium',
-                'supporting_metrics': {
-                    'profit_margin': profit_margin,
-                    'revenue': revenue,
-                    'profit': item.get('profit', 0)
-                },
-                'recommended_action': (
-                    f"{item.get('product_name')} has {profit_margin:.1f}% profit margin but isn't in top sellers. "
-                    f"Consider promoting it more to increase overall profitability."
-                ),
-                'match_strength': min(profit_margin / 50, 1.0),
-                'significance': min(revenue / 30000, 1.0)
-            })
+    # High margin products not in top sellers
+    opportunities = filter_records(
+        profitability_data,
+        {'profit_margin': 0, 'revenue': 0, 'product_id': None},
+        lambda df: (
+            (df['profit_margin'] > 20)
+            & (df['revenue'] > 5000)
+            & ~df['product_id'].isin(list(top_seller_ids))
+        )
+    )
     
-    return insights
+    return [_build_high_profit_insight(item) for item in opportunities]
 
 
 def evaluate_profit_concentration(best_sellers: List[Dict[str, Any]], profitability_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -68,14 +86,15 @@ def evaluate_profit_concentration(best_sellers: List[Dict[str, Any]], profitabil
     low_margin_count = 0
     total_profit = 0
     
-    for product in best_sellers[:5]:
+    for product in islice(best_sellers, 5):
         product_id = product.get('product_id')
-        revenue = product.get('total_amount', 0) or product.get('total_revenue', 0)
+        revenue = product.get('total_amount', 0)
         top_5_revenue += revenue
         
-        if product_id in profit_lookup:
-            margin = profit_lookup[product_id].get('profit_margin', 0)
-            profit = profit_lookup[product_id].get('profit', 0) or (revenue * margin / 100)
+        profit_row = profit_lookup.get(product_id)
+        if profit_row is not None:
+            margin = profit_row.get('profit_margin', 0)
+            profit = profit_row.get('profit', 0)
             total_profit += profit
             
             if margin < 10:
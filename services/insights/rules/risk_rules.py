@@ -1,6 +1,37 @@
 """Risk identification rules."""
 
 from typing import List, Dict, Any
+from services.insights.rules.filters import filter_records
+
+_DEAD_STOCK_ACTION = "Consider discounting or discontinuing {product}. Stock value: ₹{value:.2f}"
+
+
+def _build_dead_stock_insight(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the dead-stock insight for one stale item."""
+    days_since_sale = item.get('days_since_sale', 0)
+    current_stock = item.get('current_stock', 0)
+    estimated_value = item.get('estimated_value', 0)
+    
+    # Higher confidence for older stock
+    confidence = 'high' if days_since_sale > 180 else 'medium'
+    
+    return {
+        'insight_id': f"dead_stock_{item.get('product_id', 'unknown')}",
+        'title': f"Dead Stock: {item.get('product_name', 'Unknown Product')}",
+        'category': 'risk',
+        'confidence': confidence,
+        'supporting_metrics': {
+            'days_since_sale': days_since_sale,
+            'current_stock': current_stock,
+            'estimated_value': estimated_value
+        },
+        'recommended_action': _DEAD_STOCK_ACTION.format(
+            product=item.get('product_name'),
+            value=estimated_value
+        ),
+        'match_strength': min(days_since_sale / 180, 1.0),
+        'significance': min(estimated_value / 10000, 1.0) if estimated_value > 0 else 0
+    }
 
 
 def evaluate_dead_stock_rule(dead_stock_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -13,33 +44,10 @@ def evaluate_dead_stock_rule(dead_stock_data: List[Dict[str, Any]]) -> List[Dict
     Returns:
         List of insights
     """
-    insights = []
-    
-    for item in dead_stock_data:
-        days_since_sale = item.get('days_since_sale', 0)
-        current_stock = item.get('current_stock', 0)
-        estimated_value = item.get('estimated_value', 0)
-        
-        if days_since_sale > 90 and current_stock > 0:
-            # Higher confidence for older stock
-            confidence = 'high' if days_since_sale > 180 else 'medium'
-            
-            insights.append({
-                'insight_id': f"dead_stock_{item.get('product_id', 'unknown')}",
-                'title': f"Dead Stock: {item.get('product_name', 'Unknown Product')}",
-                'category': 'risk',
-                'confidence': confidence,
-                'supporting_metrics': {
-                    'days_since_sale': days_since_sale,
-                    'current_stock': current_stock,
-                    'estimated_value': estimated_value
-                },
-                'recommended_action': (
-                    f"Consider discounting or discontinuing {item.get('product_name')}. "
-                    f"Stock value: ₹{estimated_value:.2f}"
-                ),
-                'match_strength': min(days_since_sale / 180, 1.0),
-                'significance': min(estimated_value / 10000, 1.0) if estimated_value > 0 else 0
-            })
+    stale_stock = filter_records(
+        dead_stock_data,
+        {'days_since_sale': 0, 'current_stock': 0},
+        lambda df: (df['days_since_sale'] > 90) & (df['current_stock'] > 0)
+    )
     
-    return insights
+    return [_build_dead_stock_insight(item) for item in stale_stock]
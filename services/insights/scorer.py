@@ -1,6 +1,9 @@
 """Confidence scoring for insights."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+# Indexed by how many of the 0.4 / 0.7 thresholds a score reaches
+_LABELS = ('low', 'medium', 'high')
 
 
 def score_confidence(
@@ -31,10 +34,36 @@ def score_confidence(
     match_strength = rule_result.get('match_strength', 0)
     score += match_strength * 0.3
     
-    # Map to confidence level
-    if score >= 0.7:
-        return 'high'
-    elif score >= 0.4:
-        return 'medium'
-    else:
-        return 'low'
+    return _confidence_level(score)
+
+
+def score_confidence_batch(
+    rule_results: List[Dict[str, Any]],
+    data_quality: Dict[str, Any]
+) -> List[str]:
+    """
+    Calculate confidence levels for many insights sharing the same data quality.
+    
+    Args:
+        rule_results: Results from rule evaluation
+        data_quality: Data quality metrics
+        
+    Returns:
+        Confidence level per rule result, in order
+    """
+    # Data completeness term is the same for every insight
+    base = data_quality.get('completeness', 0) * 0.4
+    return [
+        _confidence_level(
+            base
+            + rule_result.get('significance', 0) * 0.3
+            + rule_result.get('match_strength', 0) * 0.3
+        )
+        for rule_result in rule_results
+    ]
+
+
+def _confidence_level(score: float) -> str:
+    """Map a 0-1 score to a confidence level."""
+    # int() so numpy scores (np.bool_ comparisons) still index the tuple
+    return _LABELS[int(score >= 0.4) + int(score >= 0.7)]
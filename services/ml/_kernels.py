@@ -0,0 +1,198 @@
+"""Numeric kernels for sales forecasting.
+
+Forecasts use Holt's linear trend method with a damped trend, run as a
+fixed-parameter recursive filter compiled with Numba when available and
+vectorized across products with NumPy when not. Callers can opt in to fitting
+the smoothing parameters per product with statsmodels (used for
+single-product forecasts, where one fit is cheap).
+"""
+
+import warnings
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+try:
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+except ImportError:
+    ExponentialSmoothing = None
+
+# Smoothing weights for level and trend, and the per-day trend damping factor
+ALPHA = 0.3
+BETA = 0.1
+PHI = 0.9
+
+# Fewest days statsmodels is asked to fit; shorter series use the fixed filter
+_MIN_FIT_DAYS = 10
+
+
+def _holt_loops(
+    history: np.ndarray,
+    length: np.ndarray,
+    qty_sum: np.ndarray,
+    revenue_sum: np.ndarray,
+    days_ahead: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-product loop version of the fixed-parameter filter (compiled by Numba)."""
+    products = history.shape[0]
+    predicted_qty = np.zeros((products, days_ahead))
+    predicted_revenue = np.zeros((products, days_ahead))
+    variation = np.ones(products)
+    
+    for p in prange(products):
+        n = length[p]
+        level = history[p, 0]
+        trend = history[p, 1] - history[p, 0]
+        total = history[p, 0]
+        sse = 0.0
+        for t in range(1, n):
+            y = history[p, t]
+            fitted = level + PHI * trend
+            error = y - fitted
+            sse += error * error
+            total += y
+            new_level = ALPHA * y + (1 - ALPHA) * fitted
+            trend = BETA * (new_level - level) + (1 - BETA) * PHI * trend
+            level = new_level
+    
+        # One-step-ahead error relative to the mean daily quantity
+        mean = total / n
+        if mean > 0:
+            variation[p] = np.sqrt(sse / (n - 1)) / mean
+    
+        avg_price = revenue_sum[p] / qty_sum[p] if qty_sum[p] > 0 else 0.0
+        damping = 0.0
+        phi_h = 1.0
+        for i in range(days_ahead):
+            phi_h *= PHI
+            damping += phi_h
+            qty = level + damping * trend
+            if not qty > 0:
+                qty = 0.0
+            predicted_qty[p, i] = qty
+            predicted_revenue[p, i] = qty * avg_price
+    
+    return predicted_qty, predicted_revenue, variation
+
+
+def _holt_vectorized(
+    history: np.ndarray,
+    length: np.ndarray,
+    qty_sum: np.ndarray,
+    revenue_sum: np.ndarray,
+    days_ahead: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """NumPy version of the fixed-parameter filter, stepping all products together."""
+    level = history[:, 0].copy()
+    trend = history[:, 1] - history[:, 0]
+    sse = np.zeros_like(level)
+    
+    for t in range(1, history.shape[1]):
+        active = t < length
+        y = history[:, t]
+        fitted = level + PHI * trend
+        error = y - fitted
+        new_level = ALPHA * y + (1 - ALPHA) * fitted
+        new_trend = BETA * (new_level - level) + (1 - BETA) * PHI * trend
+        sse = np.where(active, sse + error * error, sse)
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+    
+    # One-step-ahead error relative to the mean daily quantity
+    n = length.astype(np.float64)
+    x = np.arange(history.shape[1])
+    mean = np.where(x < length[:, None], history, 0.0).sum(axis=1) / n
+    variation = np.ones_like(mean)
+    np.divide(np.sqrt(sse / (n - 1)), mean, out=variation, where=mean > 0)
+    
+    avg_price = np.zeros_like(mean)
+    np.divide(revenue_sum, qty_sum, out=avg_price, where=qty_sum > 0)
+    
+    damping = np.cumsum(PHI ** np.arange(1, days_ahead + 1, dtype=np.float64))
+    predicted_qty = level[:, None] + damping * trend[:, None]
+    predicted_qty = np.where(predicted_qty > 0, predicted_qty, 0.0)
+    predicted_revenue = predicted_qty * avg_price[:, None]
+    
+    return predicted_qty, predicted_revenue, variation
+
+
+_holt_impl = (
+    njit(cache=True, parallel=True)(_holt_loops)
+    if njit is not None
+    else _holt_vectorized
+)
+
+
+def _fit_statsmodels(
+    history: np.ndarray,
+    length: np.ndarray,
+    qty_sum: np.ndarray,
+    revenue_sum: np.ndarray,
+    days_ahead: int,
+    predicted_qty: np.ndarray,
+    predicted_revenue: np.ndarray,
+    variation: np.ndarray
+) -> None:
+    """Overwrite filter results in place with per-product fitted Holt models."""
+    for p in np.flatnonzero(length >= _MIN_FIT_DAYS):
+        y = history[p, :length[p]]
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                fit = ExponentialSmoothing(
+                    y, trend='add', damped_trend=True, initialization_method='estimated'
+                ).fit()
+        except (ValueError, np.linalg.LinAlgError):
+            continue
+    
+        qty = np.clip(np.asarray(fit.forecast(days_ahead), dtype=np.float64), 0.0, None)
+        if not np.isfinite(qty).all():
+            continue
+    
+        mean = y.mean()
+        avg_price = revenue_sum[p] / qty_sum[p] if qty_sum[p] > 0 else 0.0
+        predicted_qty[p] = qty
+        predicted_revenue[p] = qty * avg_price
+        variation[p] = np.sqrt(fit.sse / (length[p] - 1)) / mean if mean > 0 else 1.0
+
+
+def forecast_kernel(
+    history: np.ndarray,
+    length: np.ndarray,
+    qty_sum: np.ndarray,
+    revenue_sum: np.ndarray,
+    days_ahead: int,
+    fit: bool = False
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Project daily quantity and revenue for many products at once.
+    
+    Args:
+        history: (products, days) float64 matrix of each product's recent
+            daily quantities, oldest first, left-aligned
+        length: Number of valid entries per row (at least 3)
+        qty_sum: Total quantity over each product's history
+        revenue_sum: Total revenue over the same days
+        days_ahead: Number of days to project
+        fit: Refit the smoothing parameters per product with statsmodels
+            (if installed); slow on large catalogs
+    
+    Returns:
+        Tuple of (predicted quantity, predicted revenue) arrays of shape
+        (products, days_ahead) and the one-step-ahead error relative to mean
+        daily quantity per product
+    """
+    predicted_qty, predicted_revenue, variation = _holt_impl(
+        history, length, qty_sum, revenue_sum, days_ahead
+    )
+    if fit and ExponentialSmoothing is not None:
+        _fit_statsmodels(
+            history, length, qty_sum, revenue_sum, days_ahead,
+            predicted_qty, predicted_revenue, variation
+        )
+    return predicted_qty, predicted_revenue, variation
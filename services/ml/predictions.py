@@ -1,15 +1,34 @@
 """Machine Learning-based predictions for sales forecasting and demand prediction."""
 
+import asyncio
+import math
+import time
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from storage.database import Database
 from storage.cache import CacheManager
+from services.ml._kernels import forecast_kernel
 from utils.logging import setup_logging
 
 logger = setup_logging()
 
+# Modified z-score constant: MAD / 0.6745 estimates the standard deviation
+_MAD_SCALE = 0.6745
+
+# Days of recent history each product's forecast is fitted on
+_HISTORY_DAYS = 30
+
+# Column order of the forecast query's row tuples
+_FORECAST_COLUMNS = ['date', 'product_id', 'product_name', 'daily_quantity', 'daily_revenue']
+
+# Forecasts keyed by (dataset_id, product_id, days_ahead, data version), LRU with TTL
+_FORECAST_CACHE_SIZE = 256
+_FORECAST_CACHE_TTL = 300  # seconds
+_forecast_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
 
 async def predict_sales_forecast(
     db: Database,
@@ -21,7 +40,7 @@ async def predict_sales_forecast(
     """
     Predict sales for next N days using time series analysis.
     
-    Uses simple moving average and trend analysis for forecasting.
+    Uses Holt's exponential smoothing with a damped linear trend.
     
     Args:
         db: Database instance
@@ -33,15 +52,43 @@ async def predict_sales_forecast(
     Returns:
         Dictionary with predictions and confidence scores
     """
-    # Get sales data
+    # New or deleted sales rows change the version, invalidating the entry
+    version = await db.execute_query(
+        "SELECT MAX(rowid) as max_row_id, COUNT(*) as row_count FROM raw_sales WHERE dataset_id = ?",
+        (dataset_id,),
+        fetch_one=True
+    )
+    key = (dataset_id, product_id, days_ahead, version['max_row_id'], version['row_count'])
+    now = time.monotonic()
+    cached = _forecast_cache.get(key)
+    if cached is not None and cached[0] > now:
+        _forecast_cache.move_to_end(key)
+        return dict(cached[1])
+    
+    forecast = await _compute_sales_forecast(db, dataset_id, days_ahead, product_id)
+    _forecast_cache[key] = (now + _FORECAST_CACHE_TTL, forecast)
+    _forecast_cache.move_to_end(key)
+    while len(_forecast_cache) > _FORECAST_CACHE_SIZE:
+        _forecast_cache.popitem(last=False)
+    return dict(forecast)
+
+
+async def _compute_sales_forecast(
+    db: Database,
+    dataset_id: str,
+    days_ahead: int,
+    product_id: Optional[str]
+) -> Dict[str, Any]:
+    """Run the forecast query and kernel (uncached body of predict_sales_forecast)."""
+    # Get daily sales (pre-aggregated per date, product_id and product_name on ingest)
     query = """
         SELECT 
             date,
             product_id,
             product_name,
-            SUM(quantity) as daily_quantity,
-            SUM(total_amount) as daily_revenue
-        FROM raw_sales
+            quantity as daily_quantity,
+            revenue as daily_revenue
+        FROM daily_sales
         WHERE dataset_id = ?
     """
     params = [dataset_id]
@@ -50,9 +97,9 @@ async def predict_sales_forecast(
         query += " AND product_id = ?"
         params.append(product_id)
     
-    query += " GROUP BY date, product_id, product_name ORDER BY date ASC"
+    query += " ORDER BY date, product_id, product_name"
     
-    rows = await db.execute_query(query, tuple(params))
+    rows = await db.execute_query_tuples(query, tuple(params))
     
     if not rows or len(rows) < 7:
         return {
@@ -61,143 +108,291 @@ async def predict_sales_forecast(
             'confidence': 'low'
         }
     
-    df = pd.DataFrame(rows)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
+    if product_id:
+        # SQL already filtered to one product and ordered by date; skip pandas.
+        # A single series is cheap enough to fit its own smoothing parameters
+        series, history, length, qty_sum, revenue_sum = _single_product_inputs(rows)
+        predicted_qty, predicted_revenue, variation = forecast_kernel(
+            history, length, qty_sum, revenue_sum, days_ahead, fit=True
+        )
+    else:
+        # Frame building and the kernel are CPU-bound on large catalogs;
+        # run them on a worker thread so the event loop keeps serving requests
+        series, (predicted_qty, predicted_revenue, variation) = await asyncio.to_thread(
+            _forecast_all_products, rows, days_ahead
+        )
     
-    predictions = []
+    # Adjust confidence based on in-sample forecast error (tolist() for plain str labels)
+    confidences = np.select([variation < 0.3, variation > 0.7], ['high', 'low'], 'medium').tolist()
     
-    # Group by product for individual predictions
-    for product_id_val in df['product_id'].unique() if 'product_id' in df.columns else [None]:
-        product_data = df[df['product_id'] == product_id_val] if product_id_val else df
-        
-        # Get last 30 days of data (or all if less)
-        recent_data = product_data.tail(30)
-        
-        if len(recent_data) < 3:
-            continue
-        
-        # Calculate moving averages
-        ma_7 = recent_data['daily_quantity'].tail(7).mean()
-        ma_14 = recent_data['daily_quantity'].tail(14).mean() if len(recent_data) >= 14 else ma_7
-        
-        # Calculate trend (slope)
-        recent_quantities = recent_data['daily_quantity'].tail(7).values
-        if len(recent_quantities) >= 3:
-            x = np.arange(len(recent_quantities))
-            trend_slope = np.polyfit(x, recent_quantities, 1)[0] if len(recent_quantities) >= 2 else 0
-        else:
-            trend_slope = 0
-        
-        # Predict next days
-        last_date = recent_data['date'].max()
-        base_prediction = ma_7
-        confidence = 'medium'
-        
-        # Adjust confidence based on data consistency
-        std_dev = recent_data['daily_quantity'].tail(7).std()
-        mean_qty = recent_data['daily_quantity'].tail(7).mean()
-        coefficient_of_variation = std_dev / mean_qty if mean_qty > 0 else 1
-        
-        if coefficient_of_variation < 0.3:
-            confidence = 'high'
-        elif coefficient_of_variation > 0.7:
-            confidence = 'low'
-        
-        # Generate predictions
-        for i in range(1, days_ahead + 1):
-            pred_date = last_date + timedelta(days=i)
-            # Apply trend adjustment (diminishing effect over time)
-            trend_adjustment = trend_slope * (1 - 0.1 * i)  # Trend weakens over time
-            predicted_qty = max(0, base_prediction + trend_adjustment)
-            
-            # Predict revenue based on average price
-            avg_price = recent_data['daily_revenue'].sum() / recent_data['daily_quantity'].sum() if recent_data['daily_quantity'].sum() > 0 else 0
-            predicted_revenue = predicted_qty * avg_price
-            
-            predictions.append({
-                'date': pred_date.strftime('%Y-%m-%d'),
-                'product_id': product_id_val,
-                'product_name': product_data['product_name'].iloc[0] if len(product_data) > 0 else 'All Products',
-                'predicted_quantity': round(float(predicted_qty), 2),
-                'predicted_revenue': round(float(predicted_revenue), 2),
-                'confidence': confidence,
-                'method': 'moving_average_with_trend'
-            })
+    predictions = [
+        {
+            'date': (last_date + timedelta(days=i)).strftime('%Y-%m-%d'),
+            'product_id': product_id_val,
+            'product_name': product_name,
+            'predicted_quantity': round(float(qty), 2),
+            'predicted_revenue': round(float(revenue), 2),
+            'confidence': confidence,
+            'method': 'holt_linear_trend'
+        }
+        for product_id_val, product_name, last_date, confidence, qty_row, revenue_row in zip(
+            series['product_id'], series['product_name'], series['last_date'],
+            confidences, predicted_qty, predicted_revenue
+        )
+        for i, qty, revenue in zip(range(1, days_ahead + 1), qty_row, revenue_row)
+    ]
     
     return {
         'predictions': predictions,
-        'method': 'moving_average_with_trend',
+        'method': 'holt_linear_trend',
         'confidence': 'medium',
         'days_ahead': days_ahead
     }
 
 
+def _forecast_all_products(
+    rows: List[Dict[str, Any]],
+    days_ahead: int
+) -> Tuple[Dict[str, list], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Forecast every product in the query rows.
+    
+    Args:
+        rows: Daily sales row tuples in _FORECAST_COLUMNS order
+        days_ahead: Number of days to predict
+        
+    Returns:
+        Tuple of (series dict from _forecast_inputs, forecast_kernel outputs)
+    """
+    df = pd.DataFrame(rows, columns=_FORECAST_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date')
+    series, history, length, qty_sum, revenue_sum = _forecast_inputs(df)
+    return series, forecast_kernel(history, length, qty_sum, revenue_sum, days_ahead)
+
+
+def _single_product_inputs(
+    rows: List[Dict[str, Any]]
+) -> Tuple[Dict[str, list], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build forecast kernel inputs for one product straight from query rows.
+    
+    Args:
+        rows: Daily sales row tuples (_FORECAST_COLUMNS) for a single product, ordered by date
+        
+    Returns:
+        Same layout as _forecast_inputs, with series as a dict of one-element lists
+    """
+    recent = rows[-_HISTORY_DAYS:]
+    quantity = np.array([row[3] for row in recent], dtype=np.float64)
+    revenue = np.array([row[4] for row in recent], dtype=np.float64)
+    
+    series = {
+        'product_id': [rows[0][1]],
+        'product_name': [rows[0][2]],
+        'last_date': [pd.Timestamp(recent[-1][0])]
+    }
+    history = np.zeros((1, _HISTORY_DAYS))
+    history[0, :len(quantity)] = quantity
+    
+    return (
+        series,
+        history,
+        np.array([len(quantity)]),
+        np.array([quantity.sum()]),
+        np.array([revenue.sum()])
+    )
+
+
+def _forecast_inputs(
+    df: pd.DataFrame
+) -> Tuple[Dict[str, list], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gather per-product forecast kernel inputs for all products in one groupby pass.
+    
+    Each product is forecast from its last 30 days; rows with a missing or
+    empty product_id are forecast from all products together. Products with
+    fewer than 3 days are dropped.
+    
+    Args:
+        df: Daily sales sorted by date (date, product_id, product_name,
+            daily_quantity, daily_revenue)
+        
+    Returns:
+        Tuple of (series dict of product_id, product_name and last_date lists
+        in first-appearance order, with None for blank product ids; (P, 30) left-aligned daily quantity matrix;
+        history lengths; 30-day quantity totals; 30-day revenue totals)
+    """
+    codes, product_ids = pd.factorize(df['product_id'], use_na_sentinel=False)
+    blank = [code for code, pid in enumerate(product_ids) if pd.isna(pid) or not pid]
+    
+    frame = df.assign(_series=codes)
+    if blank:
+        frame = pd.concat(
+            [frame[~np.isin(codes, blank)]] + [df.assign(_series=code) for code in blank]
+        )
+    
+    first_rows = frame.drop_duplicates('_series').set_index('_series')
+    
+    # Last 30 days per series
+    recent = frame.groupby('_series', sort=False).tail(_HISTORY_DAYS)
+    grouped = recent.groupby('_series', sort=False)
+    series = grouped.agg(
+        days=('daily_quantity', 'size'),
+        qty_sum=('daily_quantity', 'sum'),
+        revenue_sum=('daily_revenue', 'sum'),
+        last_date=('date', 'max')
+    )
+    series = series[series['days'] >= 3].sort_index()
+    
+    # Plain lists: a DataFrame column would turn None ids back into NaN,
+    # which is not valid JSON
+    labels = {
+        'product_id': [None if pd.isna(product_ids[code]) else product_ids[code] for code in series.index],
+        'product_name': first_rows['product_name'].reindex(series.index).tolist(),
+        'last_date': series['last_date'].tolist()
+    }
+    
+    # Those days, left-aligned into a (P, 30) matrix
+    length = series['days'].to_numpy()
+    row_of = pd.Series(np.arange(len(series)), index=series.index)
+    rows = row_of.reindex(recent['_series'].to_numpy()).to_numpy()
+    kept = ~np.isnan(rows)
+    rows = rows[kept].astype(np.intp)
+    cols = grouped.cumcount().to_numpy()[kept]
+    history = np.zeros((len(series), _HISTORY_DAYS))
+    history[rows, cols] = recent['daily_quantity'].to_numpy(dtype=np.float64)[kept]
+    
+    return (
+        labels,
+        history,
+        length,
+        series['qty_sum'].to_numpy(dtype=np.float64),
+        series['revenue_sum'].to_numpy(dtype=np.float64)
+    )
+
+
 async def detect_anomalies(
     db: Database,
     cache: CacheManager,
     dataset_id: str,
-    threshold: float = 2.0
+    threshold: float = 2.0,
+    method: str = "zscore"
 ) -> List[Dict[str, Any]]:
     """
     Detect anomalies in sales data using statistical methods.
     
-    Uses z-score to identify unusual patterns.
+    Uses z-score to identify unusual patterns, or the MAD-based modified
+    z-score, which is robust to the outliers it is looking for.
     
     Args:
         db: Database instance
         cache: Cache manager instance
         dataset_id: Dataset identifier
         threshold: Z-score threshold (default: 2.0 = 95% confidence)
+        method: 'zscore' (mean/std) or 'mad' (median/MAD)
         
     Returns:
-        List of detected anomalies
+        List of detected anomalies; deviation_percent is None when the
+        expected quantity is 0
+        
+    Raises:
+        ValueError: If method is not 'zscore' or 'mad'
+    """
+    if method == "mad":
+        return await _detect_anomalies_mad(db, dataset_id, threshold)
+    if method != "zscore":
+        raise ValueError(f"Unknown anomaly detection method: {method}")
+    
+    # SQLite aggregates the days, computes mean and sample variance, and
+    # returns only the anomalous days: |q - mean| > threshold * std
+    # compared squared, since SQLite may lack SQRT
+    query = """
+        WITH daily AS (
+            SELECT date, SUM(quantity) AS q
+            FROM daily_sales
+            WHERE dataset_id = ?
+            GROUP BY date
+        ),
+        stats AS (
+            SELECT AVG(q) AS m, COUNT(*) AS n FROM daily
+        ),
+        spread AS (
+            SELECT SUM((d.q - s.m) * (d.q - s.m)) / (s.n - 1.0) AS v
+            FROM daily d, stats s
+        )
+        SELECT d.date, d.q AS daily_quantity, s.m AS mean_qty, sp.v AS var_qty
+        FROM daily d, stats s, spread sp
+        WHERE s.n >= 7 AND sp.v > 0
+          AND (d.q - s.m) * (d.q - s.m) > ? * sp.v
+        ORDER BY d.date ASC
     """
-    # Get daily sales data
+    
+    rows = await db.execute_query_tuples(query, (dataset_id, threshold * threshold))
+    
+    anomalies = []
+    for date, observed, mean_qty, var_qty in rows:
+        observed = float(observed)
+        mean_qty = float(mean_qty)
+        z_score = (observed - mean_qty) / math.sqrt(var_qty)
+        anomalies.append({
+            'date': date,
+            'type': 'spike' if z_score > 0 else 'drop',
+            'observed_quantity': observed,
+            'expected_quantity': mean_qty,
+            'deviation_percent': (observed - mean_qty) / mean_qty * 100 if mean_qty else None,
+            'z_score': z_score,
+            'severity': 'high' if abs(z_score) > 3 else 'medium'
+        })
+    
+    return anomalies
+
+
+async def _detect_anomalies_mad(
+    db: Database,
+    dataset_id: str,
+    threshold: float
+) -> List[Dict[str, Any]]:
+    """Modified z-score (median/MAD) variant of detect_anomalies."""
     query = """
         SELECT 
             date,
-            SUM(quantity) as daily_quantity,
-            SUM(total_amount) as daily_revenue
-        FROM raw_sales
+            SUM(quantity) as daily_quantity
+        FROM daily_sales
         WHERE dataset_id = ?
         GROUP BY date
         ORDER BY date ASC
     """
     
-    rows = await db.execute_query(query, (dataset_id,))
+    rows = await db.execute_query_tuples(query, (dataset_id,))
     
     if not rows or len(rows) < 7:
         return []
     
-    df = pd.DataFrame(rows)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    anomalies = []
+    qty = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
     
-    # Calculate z-scores for quantity
-    mean_qty = df['daily_quantity'].mean()
-    std_qty = df['daily_quantity'].std()
+    center = float(np.median(qty))
+    scale = float(np.median(np.abs(qty - center))) / _MAD_SCALE
+    if not scale > 0:
+        return []
     
-    if std_qty > 0:
-        df['z_score_qty'] = (df['daily_quantity'] - mean_qty) / std_qty
-        
-        # Find anomalies
-        anomaly_rows = df[df['z_score_qty'].abs() > threshold]
-        
-        for _, row in anomaly_rows.iterrows():
-            anomaly_type = 'spike' if row['z_score_qty'] > 0 else 'drop'
-            anomalies.append({
-                'date': row['date'].strftime('%Y-%m-%d'),
-                'type': anomaly_type,
-                'observed_quantity': float(row['daily_quantity']),
-                'expected_quantity': float(mean_qty),
-                'deviation_percent': float((row['daily_quantity'] - mean_qty) / mean_qty * 100),
-                'z_score': float(row['z_score_qty']),
-                'severity': 'high' if abs(row['z_score_qty']) > 3 else 'medium'
-            })
+    z_scores = (qty - center) / scale
+    # No percentage of a zero median (would be inf/nan, which is not valid JSON)
+    deviation_percent = (qty - center) / center * 100 if center else None
     
-    return anomalies
+    # Find anomalies (dates are stored as ISO YYYY-MM-DD)
+    return [
+        {
+            'date': rows[i][0],
+            'type': 'spike' if z_scores[i] > 0 else 'drop',
+            'observed_quantity': float(qty[i]),
+            'expected_quantity': center,
+            'deviation_percent': float(deviation_percent[i]) if deviation_percent is not None else None,
+            'z_score': float(z_scores[i]),
+            'severity': 'high' if abs(z_scores[i]) > 3 else 'medium'
+        }
+        for i in np.flatnonzero(np.abs(z_scores) > threshold)
+    ]
 
 
 async def predict_demand(
@@ -1,12 +1,74 @@
 """Parquet cache management."""
 
+import threading
 import pandas as pd
+import pyarrow as pa
 import pyarrow.parquet as pq
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 from utils.exceptions import CacheError
 
+# Byte budget for DataFrames held in memory in front of the Parquet files
+MEMORY_CACHE_LIMIT = 512 * 1024 * 1024
+
+# Parquet layout for cache files: most frames fit in a single row group
+PARQUET_ROW_GROUP_SIZE = 256 * 1024
+PARQUET_PAGE_SIZE = 1 << 20
+
+
+class _MemoryTier:
+    """Process-wide LRU of decoded cache frames, bounded by memory usage."""
+    
+    def __init__(self, limit: int = MEMORY_CACHE_LIMIT):
+        self.limit = limit
+        self.frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+    
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        size = int(frame.memory_usage(deep=True).sum())
+        if size > self.limit:
+            return
+        with self.lock:
+            self._pop(key)
+            self.frames[key] = frame
+            self.sizes[key] = size
+            self.bytes += size
+            while self.bytes > self.limit:
+                self._pop(next(iter(self.frames)))
+    
+    def pop(self, key: str) -> None:
+        with self.lock:
+            self._pop(key)
+    
+    def pop_prefix(self, prefix: str) -> None:
+        with self.lock:
+            for key in [k for k in self.frames if k.startswith(prefix)]:
+                self._pop(key)
+    
+    def _pop(self, key: str) -> None:
+        if self.frames.pop(key, None) is not None:
+            self.bytes -= self.sizes.pop(key)
+
+
+# CacheManager is created per request, so the memory tier lives at module level
+_memory = _MemoryTier()
+
 
 class CacheManager:
     """Manages Parquet cache for analytics results."""
@@ -20,6 +82,27 @@ class CacheManager:
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._mem = _memory
+    
+    @property
+    def hits(self) -> int:
+        """Reads served from the in-memory tier."""
+        return self._mem.hits
+    
+    @property
+    def misses(self) -> int:
+        """Reads that fell through to Parquet."""
+        return self._mem.misses
+    
+    def memory_stats(self) -> Dict[str, int]:
+        """Entry count, byte usage and hit/miss counters of the memory tier."""
+        return {
+            "entries": len(self._mem.frames),
+            "bytes": self._mem.bytes,
+            "limit_bytes": self._mem.limit,
+            "hits": self._mem.hits,
+            "misses": self._mem.misses
+        }
     
     def get_cache_path(self, dataset_id: str, cache_key: str) -> Path:
         """
@@ -56,9 +139,20 @@ class CacheManager:
         """
         try:
             cache_path = self.get_cache_path(dataset_id, cache_key)
-            data.to_parquet(cache_path, index=False, engine='pyarrow')
+            self._mem.pop(str(cache_path))
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            pq.write_table(
+                table,
+                cache_path,
+                compression='zstd',
+                compression_level=3,
+                use_dictionary=True,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+                data_page_size=PARQUET_PAGE_SIZE,
+                write_statistics=True
+            )
             return cache_path
-        except Exception as e:
+        except (OSError, pa.ArrowException) as e:
             raise CacheError(f"Failed to write cache: {e}")
     
     def read(
@@ -69,6 +163,9 @@ class CacheManager:
         """
         Read data from cache.
         
+        Hot frames are served from memory; the returned DataFrame may be
+        shared with other readers and must not be modified in place.
+        
         Args:
             dataset_id: Dataset identifier
             cache_key: Cache key
@@ -78,10 +175,16 @@ class CacheManager:
         """
         try:
             cache_path = self.get_cache_path(dataset_id, cache_key)
+            key = str(cache_path)
+            frame = self._mem.get(key)
+            if frame is not None:
+                return frame
             if cache_path.exists():
-                return pd.read_parquet(cache_path, engine='pyarrow')
+                frame = pd.read_parquet(cache_path, engine='pyarrow')
+                self._mem.put(key, frame)
+                return frame
             return None
-        except Exception as e:
+        except (OSError, pa.ArrowException) as e:
             # If cache is corrupted, return None (will be regenerated)
             return None
     
@@ -104,13 +207,15 @@ class CacheManager:
         try:
             if cache_key:
                 cache_path = self.get_cache_path(dataset_id, cache_key)
+                self._mem.pop(str(cache_path))
                 if cache_path.exists():
                     cache_path.unlink()
             else:
                 # Delete all caches for this dataset
-                pattern = f"{dataset_id.replace('-', '_')}_*.parquet"
-                for cache_file in self.cache_dir.glob(pattern):
+                prefix = f"{dataset_id.replace('-', '_')}_"
+                self._mem.pop_prefix(str(self.cache_dir / prefix))
+                for cache_file in self.cache_dir.glob(f"{prefix}*.parquet"):
                     cache_file.unlink()
             return True
-        except Exception as e:
+        except OSError as e:
             raise CacheError(f"Failed to delete cache: {e}")
@@ -1,11 +1,135 @@
 """SQLite database operations."""
 
+import asyncio
+import os
 import aiosqlite
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import json
+from itertools import groupby
 from utils.exceptions import DatabaseError
 
+# Maximum open connections per database file
+POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "8"))
+
+# Memory-mapped I/O window per connection
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Materialized per-day, per-product totals of raw_sales (see DATABASE_SCHEMA.sql)
+_DAILY_SALES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales (
+        dataset_id TEXT NOT NULL,
+        date DATE NOT NULL,
+        product_id TEXT,
+        product_name TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        revenue REAL NOT NULL,
+        FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_daily_sales_product ON daily_sales(dataset_id, product_id, date)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_sales_date ON daily_sales(dataset_id, date)",
+)
+
+_DAILY_SALES_INSERT = """
+    INSERT INTO daily_sales (dataset_id, date, product_id, product_name, quantity, revenue)
+    SELECT dataset_id, date, product_id, product_name, SUM(quantity), SUM(total_amount)
+    FROM raw_sales
+    WHERE {condition}
+    GROUP BY dataset_id, date, product_id, product_name
+"""
+
+
+class ConnectionPool:
+    """Bounded pool of aiosqlite connections for one database file."""
+    
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        """
+        Initialize an empty pool; connections are opened lazily.
+        
+        Args:
+            db_path: Path to SQLite database file
+            size: Maximum number of open connections
+        """
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.loop = asyncio.get_running_loop()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._opened = 0
+    
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        # WAL lets readers run while a writer holds the lock
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        # NORMAL is durable under WAL except for the last commits on power loss
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        await conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+    
+    async def acquire(self) -> aiosqlite.Connection:
+        """Take an idle connection, opening one if the pool isn't full."""
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            try:
+                return await self._connect()
+            except BaseException:
+                # BaseException so a cancelled connect frees its slot too
+                self._opened -= 1
+                raise
+        return await self._idle.get()
+    
+    async def release(self, conn: aiosqlite.Connection) -> None:
+        """Return a connection to the pool, discarding uncommitted work."""
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+        except Exception:
+            # Connection is unusable; drop it so a fresh one can be opened
+            self._opened -= 1
+            await conn.close()
+            return
+        self._idle.put_nowait(conn)
+    
+    async def close(self) -> None:
+        """Close all idle connections."""
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            self._opened -= 1
+            await conn.close()
+    
+    def discard(self) -> None:
+        """Stop the worker threads of idle connections without awaiting (stale loop)."""
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+            self._opened -= 1
+
+
+_pools: Dict[str, ConnectionPool] = {}
+
+
+def _get_pool(db_path: str) -> ConnectionPool:
+    """Get the pool for a database file, creating it on the running loop."""
+    pool = _pools.get(db_path)
+    if pool is None or pool.loop is not asyncio.get_running_loop():
+        if pool is not None:
+            pool.discard()
+        pool = ConnectionPool(db_path)
+        _pools[db_path] = pool
+    return pool
+
+
+async def close_pools() -> None:
+    """Close every pooled connection (call on application shutdown)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
+
 
 class Database:
     """Database manager for SQLite operations."""
@@ -20,6 +144,16 @@ class Database:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
     
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a pooled connection for the duration of the block."""
+        pool = _get_pool(str(self.db_path))
+        conn = await pool.acquire()
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+    
     async def execute_query(
         self,
         query: str,
@@ -38,8 +172,7 @@ class Database:
             List of dictionaries (or single dict if fetch_one=True)
         """
         try:
-            async with aiosqlite.connect(str(self.db_path)) as conn:
-                conn.row_factory = aiosqlite.Row
+            async with self.connection() as conn:
                 async with conn.execute(query, params) as cursor:
                     if fetch_one:
                         row = await cursor.fetchone()
@@ -47,7 +180,37 @@ class Database:
                     else:
                         rows = await cursor.fetchall()
                         return [dict(row) for row in rows]
-        except Exception as e:
+        except aiosqlite.Error as e:
+            raise DatabaseError(f"Query execution failed: {e}")
+    
+    async def execute_query_tuples(
+        self,
+        query: str,
+        params: tuple = ()
+    ) -> List[tuple]:
+        """
+        Execute a SELECT query and return plain row tuples.
+        
+        Skips the per-row dict build of execute_query; use it for large
+        result sets read by column position.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            
+        Returns:
+            List of tuples in SELECT column order
+        """
+        try:
+            async with self.connection() as conn:
+                cursor = await conn.cursor()
+                cursor.row_factory = None
+                try:
+                    await cursor.execute(query, params)
+                    return await cursor.fetchall()
+                finally:
+                    await cursor.close()
+        except aiosqlite.Error as e:
             raise DatabaseError(f"Query execution failed: {e}")
     
     async def execute_write(
@@ -68,20 +231,22 @@ class Database:
             Last inserted row ID if return_id=True, else None
         """
         try:
-            async with aiosqlite.connect(str(self.db_path)) as conn:
-                conn.row_factory = aiosqlite.Row
+            async with self.connection() as conn:
                 cursor = await conn.execute(query, params)
                 await conn.commit()
                 if return_id:
                     return cursor.lastrowid
                 return None
-        except Exception as e:
+        except aiosqlite.Error as e:
             raise DatabaseError(f"Write operation failed: {e}")
     
     async def execute_transaction(self, queries: List[tuple]) -> bool:
         """
         Execute multiple queries in a transaction.
         
+        Runs of consecutive identical queries are sent as one executemany call
+        so SQLite compiles the statement once.
+        
         Args:
             queries: List of (query, params) tuples
             
@@ -89,15 +254,36 @@ class Database:
             True if successful
         """
         try:
-            async with aiosqlite.connect(str(self.db_path)) as conn:
-                conn.row_factory = aiosqlite.Row
-                for query, params in queries:
-                    await conn.execute(query, params)
+            async with self.connection() as conn:
+                for query, group in groupby(queries, key=lambda item: item[0]):
+                    params_list = [params for _, params in group]
+                    if len(params_list) == 1:
+                        await conn.execute(query, params_list[0])
+                    else:
+                        await conn.executemany(query, params_list)
                 await conn.commit()
                 return True
-        except Exception as e:
+        except aiosqlite.Error as e:
             raise DatabaseError(f"Transaction failed: {e}")
     
+    async def execute_many(self, query: str, params_list: List[tuple]) -> None:
+        """
+        Execute one INSERT/UPDATE/DELETE query for many parameter sets in a single transaction.
+        
+        Args:
+            query: SQL query string
+            params_list: List of parameter tuples
+        """
+        if not params_list:
+            return None
+        try:
+            async with self.connection() as conn:
+                await conn.executemany(query, params_list)
+                await conn.commit()
+                return None
+        except aiosqlite.Error as e:
+            raise DatabaseError(f"Batch write failed: {e}")
+    
     # Convenience methods for common operations
     
     async def create_dataset(
@@ -121,6 +307,37 @@ class Database:
             (dataset_id, name, source_type, file_path, file_hash, row_count, status)
         )
     
+    @staticmethod
+    def daily_sales_refresh(dataset_id: str) -> List[tuple]:
+        """
+        Statements that rebuild a dataset's daily_sales rows from raw_sales.
+        
+        Append them to the execute_transaction batch that writes raw_sales so
+        the aggregate is never out of step with the raw rows.
+        
+        Args:
+            dataset_id: Dataset identifier
+            
+        Returns:
+            List of (query, params) tuples
+        """
+        return [
+            ("DELETE FROM daily_sales WHERE dataset_id = ?", (dataset_id,)),
+            (_DAILY_SALES_INSERT.format(condition="dataset_id = ?"), (dataset_id,)),
+        ]
+    
+    async def create_daily_aggregates(self) -> None:
+        """Create the daily_sales table and backfill datasets ingested before it existed."""
+        await self.execute_transaction(
+            [(statement, ()) for statement in _DAILY_SALES_DDL]
+            + [(
+                _DAILY_SALES_INSERT.format(
+                    condition="dataset_id NOT IN (SELECT DISTINCT dataset_id FROM daily_sales)"
+                ),
+                ()
+            )]
+        )
+    
     async def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
         """Get dataset by ID."""
         query = "SELECT * FROM datasets WHERE id = ?"
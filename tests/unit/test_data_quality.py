@@ -0,0 +1,48 @@
+"""Unit tests for dataset data quality metrics."""
+
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+from services.insights.data_quality import calculate_data_quality
+from storage.database import Database, close_pools
+
+SCHEMA = Path(__file__).resolve().parents[2] / "DATABASE_SCHEMA.sql"
+
+
+def _make_db(path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.read_text())
+    conn.execute(
+        "INSERT INTO datasets (id, name, source_type, file_path, file_hash, row_count, status, user_id) "
+        "VALUES ('ds', 'Sales', 'csv', 'sales.csv', 'hash', 10, 'completed', 1)"
+    )
+    conn.executemany(
+        "INSERT INTO raw_sales (dataset_id, date, product_name, quantity, unit_price, total_amount, amount_ok) "
+        "VALUES ('ds', ?, ?, 1, 10, ?, ?)",
+        [(f"2024-01-{day:02d}", f"P{day % 3}", 0 if day == 1 else 10, int(day != 1)) for day in range(1, 11)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_calculate_data_quality_uses_dataset_rows(tmp_path):
+    path = str(tmp_path / "nafah.db")
+    _make_db(path)
+
+    async def run():
+        try:
+            return await calculate_data_quality(Database(path), "ds")
+        finally:
+            await close_pools()
+
+    quality = asyncio.run(run())
+
+    # One zero amount out of 30 critical fields, not the 0.5 error fallback
+    assert quality['completeness'] == 0.97
+    assert quality['total_rows'] == 10
+    assert quality['unique_products'] == 3
+
+    stored = sqlite3.connect(path).execute("SELECT quality_json FROM datasets WHERE id = 'ds'").fetchone()[0]
+    assert json.loads(stored) == quality
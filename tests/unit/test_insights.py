@@ -0,0 +1,22 @@
+"""Unit tests for insight confidence scoring."""
+
+import numpy as np
+
+from services.insights.scorer import score_confidence, score_confidence_batch
+
+
+def test_score_confidence_thresholds():
+    quality = {'completeness': 1.0}
+    assert score_confidence({'significance': 1.0, 'match_strength': 1.0}, quality) == 'high'
+    assert score_confidence({'significance': 0.0, 'match_strength': 0.0}, quality) == 'medium'
+    assert score_confidence({}, {'completeness': 0.5}) == 'low'
+
+
+def test_score_confidence_accepts_numpy_scores():
+    quality = {'completeness': np.float64(1.0)}
+    results = [
+        {'significance': np.float64(1.0), 'match_strength': np.float64(1.0)},
+        {'significance': np.float64(0.0), 'match_strength': np.float64(0.2)},
+    ]
+    assert score_confidence(results[0], quality) == 'high'
+    assert score_confidence_batch(results, quality) == ['high', 'medium']
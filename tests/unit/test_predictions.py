@@ -0,0 +1,32 @@
+"""Unit tests for ML anomaly detection."""
+
+import asyncio
+import json
+
+import pytest
+
+from services.ml.predictions import detect_anomalies
+
+
+class _DailyTotals:
+    """Stands in for Database, returning fixed (date, daily_quantity) rows."""
+
+    def __init__(self, quantities):
+        self.rows = [(f"2024-01-{day:02d}", qty) for day, qty in enumerate(quantities, 1)]
+
+    async def execute_query_tuples(self, query, params=None):
+        return self.rows
+
+
+def test_mad_zero_median_has_no_deviation_percent():
+    # Returns net out to a zero median while the spread stays nonzero
+    db = _DailyTotals([-5, -4, -3, 0, 3, 4, 5, 50, -50])
+    anomalies = asyncio.run(detect_anomalies(db, None, "ds", 2.0, "mad"))
+    assert [a['observed_quantity'] for a in anomalies] == [50.0, -50.0]
+    assert all(a['deviation_percent'] is None for a in anomalies)
+    json.dumps(anomalies, allow_nan=False)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(detect_anomalies(_DailyTotals([1] * 7), None, "ds", 2.0, "median"))